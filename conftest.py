@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def test_settings():
+    """Run the suite with the test settings of yatube.testing."""
+    from yatube.testing import TestSettings
+
+    with TestSettings():
+        yield
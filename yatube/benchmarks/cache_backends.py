@@ -0,0 +1,60 @@
+"""Hit latency of the shared SQLite cache against locmem and file caches.
+
+    python -m benchmarks.cache_backends --keys 1000 --repeat 20000
+
+Values are rendered-card sized strings; every ``get`` is a hit.
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from benchmarks.utils import setup_django, summary, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20000)
+    parser.add_argument('--value-size', type=int, default=2048)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache.backends.filebased import FileBasedCache
+    from django.core.cache.backends.locmem import LocMemCache
+
+    from yatube.sqlite_cache import SQLiteCache
+
+    with tempfile.TemporaryDirectory() as directory:
+        options = {'OPTIONS': {'MAX_ENTRIES': args.keys * 2}}
+        backends = {
+            'locmem': LocMemCache('benchmark', options),
+            'filebased': FileBasedCache(os.path.join(directory, 'files'),
+                                        options),
+            'sqlite': SQLiteCache(os.path.join(directory, 'cache.sqlite3'),
+                                  options),
+        }
+        keys = [f'post_card:{number}' for number in range(args.keys)]
+        value = 'x' * args.value_size
+        print(f'{"backend":>10} {"op":>8} {"p50 ms":>8} '
+              f'{"p95 ms":>8} {"p99 ms":>8}')
+        for name, cache in backends.items():
+            cache.set_many({key: value for key in keys})
+            results = {
+                'get': timed(lambda: cache.get(random.choice(keys)),
+                             args.repeat),
+                'get_many': timed(
+                    lambda: cache.get_many(random.sample(keys, 10)),
+                    args.repeat // 10
+                ),
+                'set': timed(lambda: cache.set(random.choice(keys), value),
+                             args.repeat // 10),
+            }
+            for operation, samples in results.items():
+                latency = summary(samples)
+                print(f'{name:>10} {operation:>8} {latency["p50"]:>8} '
+                      f'{latency["p95"]:>8} {latency["p99"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
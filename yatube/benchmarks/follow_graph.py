@@ -0,0 +1,98 @@
+"""Memory and latency of the in-memory follow graph.
+
+    python -m benchmarks.follow_graph --users 1000000 --edges 10000000
+
+Builds a synthetic graph (followers per author are Zipf distributed, as in
+the ``seed`` command) straight from generated pairs, without a database,
+then times follow checks, counts, suggestions and follow/unfollow.
+"""
+import argparse
+import bisect
+import itertools
+import random
+import resource
+import time
+
+from benchmarks.utils import setup_django, summary, timed
+
+
+def pairs(users, edges, skew, rng):
+    """Sorted ``(user, author)`` pairs, about ``edges`` of them."""
+    from posts.management.commands.seed import zipf_weights
+    weights = zipf_weights(users, skew, rng)
+    total = weights[-1]
+    mean = edges / users
+    for user in range(1, users + 1):
+        degree = min(int(rng.expovariate(1 / mean) + 0.5), users - 1)
+        authors = set()
+        while len(authors) < degree:
+            authors.add(bisect.bisect(weights, rng.random() * total) + 1)
+        authors.discard(user)
+        yield from ((user, author) for author in sorted(authors))
+
+
+def rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--edges', type=int, default=10000000)
+    parser.add_argument('--skew', type=float, default=1.3)
+    parser.add_argument('--repeat', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    from posts.follow_graph import FollowGraph
+
+    rng = random.Random(args.seed)
+    before = rss_mib()
+    start = time.perf_counter()
+    graph = FollowGraph(pairs(args.users, args.edges, args.skew, rng))
+    build = time.perf_counter() - start
+    print(f'{graph.edges} edges, {args.users} users')
+    print(f'generate and build: {build:.1f} s, '
+          f'arrays: {graph.nbytes() / 2 ** 20:.1f} MiB, '
+          f'peak RSS growth: {rss_mib() - before:.1f} MiB')
+
+    def sample_users():
+        return rng.randint(1, args.users)
+
+    def random_pair():
+        return sample_users(), sample_users()
+
+    def existing_pair():
+        while True:
+            user = sample_users()
+            count = graph.following_count(user)
+            if count:
+                neighbours = graph.following.neighbours(user)
+                author = next(itertools.islice(neighbours,
+                                               rng.randrange(count), None))
+                return user, author
+
+    print(f'{"operation":>16} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    operations = {
+        'follows (hit)': lambda: graph.follows(*existing_pair()),
+        'follows (miss)': lambda: graph.follows(*random_pair()),
+        'followers_count': lambda: graph.followers_count(sample_users()),
+        'following_count': lambda: graph.following_count(sample_users()),
+        'suggestions': lambda: graph.suggestions(sample_users()),
+        'follow': lambda: graph.follow(*random_pair()),
+        'unfollow': lambda: graph.unfollow(*existing_pair()),
+    }
+    for name, operation in operations.items():
+        repeat = args.repeat // 10 if name == 'suggestions' else args.repeat
+        result = summary(timed(operation, repeat))
+        print(f'{name:>16} {result["p50"]:>8} {result["p95"]:>8} '
+              f'{result["p99"]:>8}')
+
+    start = time.perf_counter()
+    graph.following.compacted()
+    print(f'compaction: {time.perf_counter() - start:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Profile page render time as the author's post count grows.
+
+    python -m benchmarks.profile_render --sizes 10 1000 50000
+
+Only the current page should be loaded, so the query count and latency
+must stay flat across sizes. The cache is cleared before every request,
+so the numbers are for a full render.
+"""
+import argparse
+
+from benchmarks.utils import setup_django, summary, test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from posts import counters
+    from posts.models import Post, User
+
+    with test_database():
+        client = Client()
+        print(f'{"posts":>8} {"queries":>8} {"p50 ms":>8} {"p95 ms":>8}')
+        for size in args.sizes:
+            author = User.objects.create_user(username=f'author_{size}')
+            Post.objects.bulk_create(
+                (Post(author=author, text=f'Пост {number}')
+                 for number in range(size))
+            )
+            counters.recount_user(author.pk)
+            url = reverse('profile', kwargs={'username': author.username})
+
+            def render():
+                cache.clear()
+                return client.get(url)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = render()
+            assert response.status_code == 200, response.status_code
+            query_count = len(queries)
+            latency = summary(timed(render, args.repeat))
+            print(f'{size:>8} {query_count:>8} '
+                  f'{latency["p50"]:>8} {latency["p95"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
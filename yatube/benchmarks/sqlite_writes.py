@@ -0,0 +1,187 @@
+"""Concurrent reads and writes: stock SQLite backend against the tuned one.
+
+    python -m benchmarks.sqlite_writes --readers 2 --writers 2 --threads 2
+
+Each backend gets its own database file with a minimal posts and comments
+schema. Like server workers, reading and writing processes run a few
+threads each. Readers read a feed page and a comment page; writers
+alternate an autocommit insert (``new_post``) and a transaction that
+reads before it writes (``add_comment``), the pattern that fails with
+"database is locked" when SQLite cannot upgrade a reader to a writer.
+Latencies are of the operations that succeeded; failures are counted as
+errors.
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.utils import setup_django, summary
+
+BACKENDS = {
+    'stock': 'django.db.backends.sqlite3',
+    'tuned': 'yatube.sqlite_backend',
+}
+
+SCHEMA = [
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INTEGER, '
+    'pub_date REAL, text TEXT, comment_count INTEGER DEFAULT 0)',
+    'CREATE INDEX post_pub_date ON post (pub_date DESC, id DESC)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'author_id INTEGER, created REAL, text TEXT)',
+    'CREATE INDEX comment_post ON comment (post_id, created DESC, id DESC)',
+]
+
+
+def create(alias, posts):
+    from django.db import connections, transaction
+    with transaction.atomic(using=alias), connections[alias].cursor() as db:
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.executemany(
+            'INSERT INTO post (author_id, pub_date, text) VALUES (%s, %s, %s)',
+            [(number % 100, time.time(), 'Пост ' * 20)
+             for number in range(posts)]
+        )
+
+
+def read(alias, rng, posts):
+    from django.db import connections
+    with connections[alias].cursor() as db:
+        db.execute('SELECT id, author_id, text FROM post '
+                   'ORDER BY pub_date DESC, id DESC LIMIT 10')
+        db.fetchall()
+        db.execute('SELECT id, author_id, text FROM comment '
+                   'WHERE post_id = %s '
+                   'ORDER BY created DESC, id DESC LIMIT 20',
+                   [rng.randint(1, posts)])
+        db.fetchall()
+
+
+def new_post(alias, rng, posts):
+    from django.db import connections
+    with connections[alias].cursor() as db:
+        db.execute('INSERT INTO post (author_id, pub_date, text) '
+                   'VALUES (%s, %s, %s)',
+                   [rng.randint(1, 100), time.time(), 'Новый пост'])
+
+
+def add_comment(alias, rng, posts):
+    from django.db import connections, transaction
+    post_id = rng.randint(1, posts)
+    with transaction.atomic(using=alias), connections[alias].cursor() as db:
+        db.execute('SELECT id FROM post WHERE id = %s', [post_id])
+        db.fetchone()
+        db.execute('INSERT INTO comment (post_id, author_id, created, text) '
+                   'VALUES (%s, %s, %s, %s)',
+                   [post_id, rng.randint(1, 100), time.time(), 'Комментарий'])
+        db.execute('UPDATE post SET comment_count = comment_count + 1 '
+                   'WHERE id = %s', [post_id])
+
+
+def worker(alias, operations, deadline, posts, seed, results):
+    from django.db import OperationalError, connections
+    rng = random.Random(seed)
+    samples, errors = [], 0
+    for operation in operations:
+        if time.perf_counter() > deadline:
+            break
+        start = time.perf_counter()
+        try:
+            operation(alias, rng, posts)
+        except OperationalError:
+            errors += 1
+        else:
+            samples.append(time.perf_counter() - start)
+    connections[alias].close()
+    results.append((samples, errors))
+
+
+def process(alias, reader, threads, deadline, posts, seed, queue):
+    """One server process: ``threads`` readers or writers."""
+    results, workers = [], []
+    for number in range(threads):
+        operations = (iter(lambda: read, None) if reader
+                      else itertools.cycle((new_post, add_comment)))
+        workers.append(threading.Thread(
+            target=worker,
+            args=(alias, operations, deadline, posts, seed * threads + number,
+                  results)
+        ))
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    queue.put((reader, [sample for samples, _ in results
+                        for sample in samples],
+               sum(errors for _, errors in results)))
+
+
+def run(alias, args):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    deadline = time.perf_counter() + args.seconds
+    processes = [
+        context.Process(target=process, args=(
+            alias, number < args.readers, args.threads, deadline,
+            args.posts, number, queue
+        ))
+        for number in range(args.readers + args.writers)
+    ]
+    for child in processes:
+        child.start()
+    results = {True: ([], 0), False: ([], 0)}
+    for _ in processes:
+        reader, samples, errors = queue.get()
+        total, total_errors = results[reader]
+        results[reader] = (total + samples, total_errors + errors)
+    for child in processes:
+        child.join()
+    return results[True], results[False]
+
+
+def report(alias, kind, result, seconds):
+    samples, errors = result
+    latency = summary(samples) if samples else {}
+    print(f'{alias:>6} {kind:>6} {len(samples) / seconds:>9.0f} '
+          f'{latency.get("p50", "-"):>8} {latency.get("p99", "-"):>8} '
+          f'{errors:>7}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=2,
+                        help='Reading processes.')
+    parser.add_argument('--writers', type=int, default=2,
+                        help='Writing processes.')
+    parser.add_argument('--threads', type=int, default=2,
+                        help='Threads per process.')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--posts', type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connections
+
+    with tempfile.TemporaryDirectory() as directory:
+        for alias, engine in BACKENDS.items():
+            connections.databases[alias] = {
+                'ENGINE': engine,
+                'NAME': os.path.join(directory, f'{alias}.sqlite3'),
+            }
+            create(alias, args.posts)
+            connections[alias].close()
+        print(f'{"engine":>6} {"op":>6} {"ops/s":>9} {"p50 ms":>8} '
+              f'{"p99 ms":>8} {"errors":>7}')
+        for alias in BACKENDS:
+            readers, writers = run(alias, args)
+            report(alias, 'read', readers, args.seconds)
+            report(alias, 'write', writers, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway test database and a private in-memory
+cache, never the project ones.
+Start them from the ``yatube`` directory: ``python -m benchmarks.<name>``.
+"""
+import contextlib
+import math
+import os
+import time
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    import django
+    django.setup()
+    from django.test.utils import override_settings, setup_test_environment
+    setup_test_environment(debug=False)
+    # One store for both aliases, so cache.clear() also drops the
+    # generation counters and the follow graph log, as in a cold start.
+    private = {'BACKEND': 'yatube.metrics.LocMemCache',
+               'LOCATION': 'benchmarks'}
+    override_settings(CACHES={'default': private, 'state': private}).enable()
+
+
+@contextlib.contextmanager
+def test_database():
+    from django.db import connection
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summary(samples):
+    """Latency percentiles of ``samples`` (seconds) in milliseconds."""
+    return {f'p{pct}': round(percentile(samples, pct) * 1000, 3)
+            for pct in (50, 95, 99)}
+
+
+def peak_memory(func):
+    """Peak Python allocation of one ``func()`` call, in KiB."""
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        func()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,154 @@
+"""Latency, query count and peak memory of the posts views.
+
+    python -m benchmarks.views --output before.json
+    python -m benchmarks.views --output after.json --compare before.json
+    python -m benchmarks.views --compare before.json after.json
+
+Seeds a test database with the ``seed`` command, then requests every view
+through the test client. By default the cache is cleared before each
+request so the numbers are for a full render; ``--warm`` keeps it.
+``--compare`` prints the change against an earlier run and exits with
+status 1 when a view got slower than ``--threshold`` percent at p95 or
+runs more queries than before.
+"""
+import argparse
+import json
+import platform
+import sys
+
+from benchmarks.utils import (peak_memory, setup_django, summary,
+                              test_database, timed)
+
+
+def scenarios(client, reader):
+    from django.db.models import Count
+    from django.urls import reverse
+
+    from posts.models import Group, Post, User
+
+    group = Group.objects.annotate(total=Count('posts')).latest('total')
+    author = User.objects.latest('stats__followers_count')
+    post = Post.objects.select_related('author').latest('comment_count')
+    post_url = {'username': post.author.username, 'post_id': post.pk}
+    return {
+        'index': lambda: client.get(reverse('index')),
+        'group_posts': lambda: client.get(
+            reverse('group_posts', kwargs={'slug': group.slug})
+        ),
+        'profile': lambda: client.get(
+            reverse('profile', kwargs={'username': author.username})
+        ),
+        'post_view': lambda: client.get(reverse('post', kwargs=post_url)),
+        'follow_index': lambda: reader.get(reverse('follow_index')),
+        'search': lambda: client.get(reverse('search'), {'q': 'кэш индекс'}),
+        'new_post': lambda: reader.post(reverse('new_post'),
+                                        {'text': 'Пост из бенчмарка'}),
+        'add_comment': lambda: reader.post(
+            reverse('add_comment', kwargs=post_url),
+            {'text': 'Комментарий из бенчмарка'}
+        ),
+    }
+
+
+def measure(request, repeat, warm):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def run():
+        if not warm:
+            cache.clear()
+        response = request()
+        assert response.status_code in (200, 302), response.status_code
+
+    run()
+    with CaptureQueriesContext(connection) as queries:
+        run()
+    result = {'queries': len(queries)}
+    result['peak_kib'] = peak_memory(run)
+    result.update(summary(timed(run, repeat)))
+    return result
+
+
+def compare(base, new, threshold):
+    print(f'{"view":>14} {"p95 ms":>18} {"change":>8} {"queries":>10} '
+          f'{"peak KiB":>20}')
+    regressed = []
+    for view, after in new['views'].items():
+        before = base['views'].get(view)
+        if before is None:
+            continue
+        change = (after['p95'] - before['p95']) / before['p95'] * 100
+        print(f'{view:>14} {before["p95"]:>8} → {after["p95"]:<7} '
+              f'{change:>+7.1f}% {before["queries"]:>4} → '
+              f'{after["queries"]:<3} '
+              f'{before["peak_kib"]:>9} → {after["peak_kib"]:<8}')
+        if change > threshold or after['queries'] > before['queries']:
+            regressed.append(view)
+    if regressed:
+        print(f'Regressed: {", ".join(regressed)}')
+    return not regressed
+
+
+def run(args):
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+
+    with test_database():
+        call_command('seed', users=args.users, posts=args.posts,
+                     comments=args.comments, follows=args.follows,
+                     seed=args.seed, stdout=sys.stderr)
+        reader = Client()
+        reader.force_login(
+            get_user_model().objects.latest('stats__following_count')
+        )
+        views = {}
+        for name, request in scenarios(Client(), reader).items():
+            if args.views and name not in args.views:
+                continue
+            views[name] = measure(request, args.repeat, args.warm)
+            print(f'{name:>14} {json.dumps(views[name])}', file=sys.stderr)
+    return {
+        'python': platform.python_version(),
+        'options': {key: value for key, value in vars(args).items()
+                    if key not in ('output', 'compare')},
+        'views': views,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--follows', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--warm', action='store_true',
+                        help='Keep the cache between requests.')
+    parser.add_argument('--views', nargs='+', help='Only run these views.')
+    parser.add_argument('--output', help='Save the results to this file.')
+    parser.add_argument('--compare', nargs='+', metavar='RESULTS',
+                        help='Compare with a saved run (or two saved runs).')
+    parser.add_argument('--threshold', type=float, default=10,
+                        help='Allowed p95 slowdown in percent.')
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        base, new = (json.load(open(path)) for path in args.compare)
+    else:
+        new = run(args)
+        if args.output:
+            with open(args.output, 'w') as output:
+                json.dump(new, output, indent=2)
+        if not args.compare:
+            return
+        base = json.load(open(args.compare[0]))
+    if not compare(base, new, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
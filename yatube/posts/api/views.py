@@ -0,0 +1,194 @@
+"""Read-only JSON API over the post feeds.
+
+Lists are keyset paginated like the HTML feeds (``?after=``/``?before=``
+cursors plus ``?limit=``) and rows are read with ``.values()`` of only the
+columns that ``?fields=`` asks for, e.g. ``?fields=id,text,author``. The
+body is streamed row by row, so an encoded page is never held in memory
+as a whole.
+"""
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (Http404, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
+from django.views.decorators.http import require_GET
+
+from ..models import Comment, Group, Post, TimelineEntry, User
+from ..paginators import CursorPaginator
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+FORMATTERS = {
+    'image': lambda name: default_storage.url(name) if name else None,
+}
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+class APIError(Exception):
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail, self.status = detail, status
+
+
+def error_response(error):
+    return JsonResponse({'detail': error.detail}, status=error.status)
+
+
+def api_view(view):
+    """GET only; ``APIError`` and ``Http404`` (raised by the paginator)
+    become a JSON error response."""
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return error_response(APIError('Not found.', status=404))
+        except APIError as error:
+            return error_response(error)
+    return wrapper
+
+
+def requested_fields(request, available):
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(available)
+    fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = sorted(set(fields) - set(available))
+    if unknown:
+        raise APIError(f'Unknown fields: {", ".join(unknown)}. '
+                       f'Available: {", ".join(available)}.')
+    return fields
+
+
+def select(queryset, fields, available, extra=()):
+    """``queryset.values()`` of public ``fields`` plus ``extra`` columns."""
+    return queryset.values(*{*(available[field] for field in fields),
+                             *extra})
+
+
+def limit(request):
+    try:
+        value = int(request.GET.get('limit', settings.PER_PAGE))
+    except ValueError:
+        raise APIError('limit must be an integer.')
+    return min(max(value, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def encode(row, fields, available):
+    return encoder.encode({
+        field: FORMATTERS.get(field, lambda value: value)(
+            row[available[field]]
+        )
+        for field in fields
+    })
+
+
+def link(request, **cursor):
+    params = request.GET.copy()
+    for key in ('after', 'before', 'page'):
+        params.pop(key, None)
+    params.update(cursor)
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def stream(request, page, fields, available):
+    def chunks():
+        yield '{"results": ['
+        for number, row in enumerate(page.object_list):
+            yield (',' if number else '') + encode(row, fields, available)
+        yield '], "next": %s, "previous": %s}' % (
+            json.dumps(page.next_cursor and link(
+                request, after=page.next_cursor)),
+            json.dumps(page.previous_cursor and link(
+                request, before=page.previous_cursor)),
+        )
+    return StreamingHttpResponse(chunks(), content_type='application/json')
+
+
+def post_list(request, queryset):
+    fields = requested_fields(request, POST_FIELDS)
+    rows = select(queryset, fields, POST_FIELDS, extra=('pub_date', 'id'))
+    page = CursorPaginator(rows, limit(request)).get_page(request.GET)
+    return stream(request, page, fields, POST_FIELDS)
+
+
+def get_or_404(queryset, **lookup):
+    row = queryset.filter(**lookup).first()
+    if row is None:
+        raise APIError('Not found.', status=404)
+    return row
+
+
+@api_view
+def index(request):
+    return post_list(request, Post.objects.all())
+
+
+@api_view
+def group_posts(request, slug):
+    group = get_or_404(Group.objects.values('pk'), slug=slug)
+    return post_list(request, Post.objects.filter(group_id=group['pk']))
+
+
+@api_view
+def profile(request, username):
+    author = get_or_404(User.objects.values('pk'), username=username)
+    return post_list(request, Post.objects.filter(author_id=author['pk']))
+
+
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        raise APIError('Authentication required.', status=401)
+    fields = requested_fields(request, POST_FIELDS)
+    entries = TimelineEntry.objects.filter(user=request.user).values(
+        'post_id', 'pub_date'
+    )
+    page = CursorPaginator(entries, limit(request),
+                           ordering=('pub_date', 'post_id')
+                           ).get_page(request.GET)
+    ids = [entry['post_id'] for entry in page.object_list]
+    posts = {row['id']: row for row in select(
+        Post.objects.filter(pk__in=ids), fields, POST_FIELDS, extra=('id',)
+    )}
+    page.object_list = [posts[pk] for pk in ids if pk in posts]
+    return stream(request, page, fields, POST_FIELDS)
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = requested_fields(request, POST_FIELDS)
+    post = get_or_404(select(Post.objects.all(), fields, POST_FIELDS),
+                      pk=post_id)
+    return HttpResponse(encode(post, fields, POST_FIELDS),
+                        content_type='application/json')
+
+
+@api_view
+def comments(request, post_id):
+    get_or_404(Post.objects.values('pk'), pk=post_id)
+    fields = requested_fields(request, COMMENT_FIELDS)
+    rows = select(Comment.objects.filter(post_id=post_id), fields,
+                  COMMENT_FIELDS, extra=('created', 'id'))
+    page = CursorPaginator(rows, limit(request),
+                           ordering=('created', 'id')).get_page(request.GET)
+    return stream(request, page, fields, COMMENT_FIELDS)
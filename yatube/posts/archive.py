@@ -0,0 +1,111 @@
+"""Date archives of the site, of a group and of an author.
+
+An archive page is a ``pub_date`` range of one of the feeds, read with the
+same ``(scope, -pub_date, -id)`` index and cursor pagination, so a month of
+an author is one range scan however old it is. Periods are in the current
+time zone. The navigation lists the months that have posts with their
+counts from ``MonthlyPostCount``, kept in step by the Post signals instead
+of aggregating the posts on every page.
+"""
+import datetime as dt
+import itertools
+
+from django.db.models import Count, DateField, F
+from django.db.models.functions import TruncMonth
+from django.http import Http404
+from django.utils import timezone
+
+from .models import MonthlyPostCount, Post
+
+SITE = 'site'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def scopes(post):
+    result = [SITE, author_scope(post.author_id)]
+    if post.group_id:
+        result.append(group_scope(post.group_id))
+    return result
+
+
+def month_of(moment):
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def bump(scope_list, pub_date, delta):
+    month = month_of(pub_date)
+    for scope in scope_list:
+        counts = MonthlyPostCount.objects.filter(scope=scope, month=month)
+        if delta < 0:
+            counts.filter(posts_count__gte=-delta).update(
+                posts_count=F('posts_count') + delta
+            )
+        elif not counts.update(posts_count=F('posts_count') + delta):
+            MonthlyPostCount.objects.bulk_create(
+                [MonthlyPostCount(scope=scope, month=month)],
+                ignore_conflicts=True
+            )
+            counts.update(posts_count=F('posts_count') + delta)
+
+
+def period(year, month=None, day=None):
+    """The first day of the period and the first day after it."""
+    try:
+        if day is not None:
+            start = dt.date(year, month, day)
+            end = start + dt.timedelta(days=1)
+        elif month is not None:
+            start = dt.date(year, month, 1)
+            end = (start + dt.timedelta(days=31)).replace(day=1)
+        else:
+            start, end = dt.date(year, 1, 1), dt.date(year + 1, 1, 1)
+    except (ValueError, OverflowError):
+        raise Http404('Нет такой даты.')
+    return start, end
+
+
+def in_period(posts, start, end):
+    def moment(day):
+        return timezone.make_aware(dt.datetime.combine(day, dt.time()))
+    return posts.filter(pub_date__gte=moment(start), pub_date__lt=moment(end))
+
+
+def navigation(scope):
+    """``(year, total, [(month, count), ...])`` of a scope, newest first."""
+    months = (MonthlyPostCount.objects
+              .filter(scope=scope, posts_count__gt=0)
+              .order_by('-month').values_list('month', 'posts_count'))
+    result = []
+    for year, rows in itertools.groupby(months, key=lambda row: row[0].year):
+        rows = list(rows)
+        result.append((year, sum(count for _, count in rows), rows))
+    return result
+
+
+def recount():
+    """Rebuild every monthly count from the posts."""
+    MonthlyPostCount.objects.all().delete()
+    posts = Post.objects.annotate(
+        month=TruncMonth('pub_date', output_field=DateField())
+    ).order_by()
+    rows = itertools.chain(
+        ((SITE, row) for row in posts.values('month')
+         .annotate(total=Count('pk'))),
+        ((author_scope(row['author']), row) for row in
+         posts.values('author', 'month').annotate(total=Count('pk'))),
+        ((group_scope(row['group']), row) for row in
+         posts.filter(group__isnull=False).values('group', 'month')
+         .annotate(total=Count('pk'))),
+    )
+    MonthlyPostCount.objects.bulk_create(
+        MonthlyPostCount(scope=scope, month=row['month'],
+                         posts_count=row['total'])
+        for scope, row in rows
+    )
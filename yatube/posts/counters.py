@@ -0,0 +1,157 @@
+"""Denormalized counters kept in step with the write paths.
+
+``Post.comment_count`` and the ``UserStats`` and ``GroupStats`` rows are
+adjusted with ``F()`` updates from the model signals, so reading them
+never needs a ``COUNT(*)``. ``GroupActivity`` counts the posts of a group
+per day over the last ``settings.GROUP_ACTIVITY_DAYS`` days. ``recount_*``
+rebuild them from the source tables; a user without a ``UserStats`` row
+gets one recounted on first read.
+"""
+import datetime as dt
+
+from django.conf import settings
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (Comment, Follow, GroupActivity, GroupStats, Post,
+                     UserStats)
+
+
+def _count_of(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by()
+        .values(field).annotate(total=Count('pk')).values('total')
+    ), Value(0))
+
+
+def bump_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def bump_user(user_id, field, delta):
+    UserStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta}
+    )
+
+
+def user_stats(user):
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return recount_user(user.pk)
+
+
+def recount_user(user_id):
+    stats, _ = UserStats.objects.update_or_create(user_id=user_id, defaults={
+        'posts_count': Post.objects.filter(author_id=user_id).count(),
+        'followers_count': Follow.objects.filter(author_id=user_id).count(),
+        'following_count': Follow.objects.filter(user_id=user_id).count(),
+    })
+    return stats
+
+
+def recount_comments():
+    Post.objects.update(
+        comment_count=_count_of(Comment.objects.all(), 'post')
+    )
+
+
+def recount_users(users):
+    for user_id in users.values_list('pk', flat=True):
+        recount_user(user_id)
+
+
+def _latest_post_date(group_id):
+    return Subquery(Post.objects.filter(group_id=group_id)
+                    .order_by('-pub_date').values('pub_date')[:1])
+
+
+def activity_since():
+    """The first day counted in ``GroupActivity``."""
+    days = settings.GROUP_ACTIVITY_DAYS
+    return timezone.localdate() - dt.timedelta(days=days - 1)
+
+
+def bump_group(group_id, pub_date, delta):
+    stats = GroupStats.objects.filter(group_id=group_id)
+    counted = stats.filter(posts_count__gte=-delta) if delta < 0 else stats
+    if not counted.update(posts_count=F('posts_count') + delta):
+        # No row yet, or it drifted below zero: count it from scratch.
+        recount_group(group_id)
+        return
+    if delta > 0:
+        stats.filter(
+            Q(last_post_at__isnull=True) | Q(last_post_at__lt=pub_date)
+        ).update(last_post_at=pub_date)
+    else:
+        stats.filter(last_post_at__lte=pub_date).update(
+            last_post_at=_latest_post_date(group_id)
+        )
+    bump_activity(group_id, timezone.localdate(pub_date), delta)
+
+
+def bump_activity(group_id, day, delta):
+    if day < activity_since():
+        return
+    activity = GroupActivity.objects.filter(group_id=group_id, day=day)
+    if delta < 0:
+        activity.filter(posts_count__gte=-delta).update(
+            posts_count=F('posts_count') + delta
+        )
+    elif not activity.update(posts_count=F('posts_count') + delta):
+        GroupActivity.objects.bulk_create(
+            [GroupActivity(group_id=group_id, day=day)],
+            ignore_conflicts=True
+        )
+        activity.update(posts_count=F('posts_count') + delta)
+
+
+def group_activity(group_ids):
+    """Posts per day of each group, oldest day first."""
+    since = activity_since()
+    days = [since + dt.timedelta(days=number)
+            for number in range(settings.GROUP_ACTIVITY_DAYS)]
+    counts = {
+        (group_id, day): total
+        for group_id, day, total in GroupActivity.objects.filter(
+            group_id__in=group_ids, day__gte=since
+        ).values_list('group_id', 'day', 'posts_count')
+    }
+    return {group_id: [counts.get((group_id, day), 0) for day in days]
+            for group_id in group_ids}
+
+
+def recount_group(group_id):
+    posts = Post.objects.filter(group_id=group_id)
+    latest = posts.order_by('-pub_date').values_list('pub_date', flat=True)
+    stats, _ = GroupStats.objects.update_or_create(
+        group_id=group_id,
+        defaults={'posts_count': posts.count(),
+                  'last_post_at': latest.first()},
+    )
+    return stats
+
+
+def recount_groups(groups):
+    """Recount the stats and rebuild the activity window of ``groups``.
+
+    Days that have left the window are dropped.
+    """
+    group_ids = list(groups.values_list('pk', flat=True))
+    for group_id in group_ids:
+        recount_group(group_id)
+    since = activity_since()
+    GroupActivity.objects.filter(day__lt=since).delete()
+    GroupActivity.objects.filter(group_id__in=group_ids).delete()
+    GroupActivity.objects.bulk_create(
+        GroupActivity(group_id=row['group'], day=row['day'],
+                      posts_count=row['total'])
+        for row in Post.objects.filter(
+            group_id__in=group_ids, pub_date__date__gte=since
+        ).annotate(day=TruncDate('pub_date')).order_by().values(
+            'group', 'day'
+        ).annotate(total=Count('pk'))
+    )
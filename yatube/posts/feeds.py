@@ -0,0 +1,111 @@
+"""RSS and Atom feeds of a group and of an author.
+
+Feeds are cached and answer conditional GETs by the same generation
+counters as the HTML pages, so a reader polling an idle group gets a 304
+without a query. Items are the newest ``settings.FEED_ITEMS`` posts, read
+from the (group|author, -pub_date) indexes.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from . import generations
+from .models import Group
+
+
+class PostFeed(Feed):
+    def item_title(self, post):
+        return Truncator(post.text).words(8)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('post', kwargs={'username': post.author.username,
+                                       'post_id': post.pk})
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_author_name(self, post):
+        return post.author.username
+
+
+class GroupFeed(PostFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def link(self, group):
+        return reverse('group_posts', kwargs={'slug': group.slug})
+
+    def description(self, group):
+        return group.description
+
+    def items(self, group):
+        return group.posts.select_related('author')[:settings.FEED_ITEMS]
+
+
+class AuthorFeed(PostFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(get_user_model(), username=username)
+
+    def title(self, author):
+        return f'Yatube: @{author.username}'
+
+    def link(self, author):
+        return reverse('profile', kwargs={'username': author.username})
+
+    def description(self, author):
+        return f'Записи пользователя @{author.username}'
+
+    def items(self, author):
+        return author.posts.select_related('author')[:settings.FEED_ITEMS]
+
+
+class GroupAtomFeed(GroupFeed):
+    feed_type = Atom1Feed
+    subtitle = GroupFeed.description
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+    subtitle = AuthorFeed.description
+
+
+def render(feed, request, **kwargs):
+    response = feed(request, **kwargs)
+    # Feed sets Last-Modified to the newest pub_date, which misses edits;
+    # condition_by_generation answers from the ETag instead.
+    del response['Last-Modified']
+    return response
+
+
+@generations.condition_by_generation(generations.group_page_key)
+@generations.cache_page_by_generation(generations.group_page_key)
+def group_rss(request, slug):
+    return render(GroupFeed(), request, slug=slug)
+
+
+@generations.condition_by_generation(generations.group_page_key)
+@generations.cache_page_by_generation(generations.group_page_key)
+def group_atom(request, slug):
+    return render(GroupAtomFeed(), request, slug=slug)
+
+
+@generations.condition_by_generation(generations.author_page_key)
+@generations.cache_page_by_generation(generations.author_page_key)
+def author_rss(request, username):
+    return render(AuthorFeed(), request, username=username)
+
+
+@generations.condition_by_generation(generations.author_page_key)
+@generations.cache_page_by_generation(generations.author_page_key)
+def author_atom(request, username):
+    return render(AuthorAtomFeed(), request, username=username)
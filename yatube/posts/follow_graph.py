@@ -0,0 +1,428 @@
+"""In-memory follow graph: follow checks, counts and suggestions.
+
+Every process keeps the whole ``Follow`` table as two adjacency lists,
+following and followers, in compressed sparse row form: one array of
+offsets indexed by user id and one array of neighbour ids, sorted per
+user, so "does A follow B" is a binary search and ten million edges take
+about 90 MB. Changes since the load go to small per-user overlay sets and
+are folded back into the arrays once they pile up.
+
+The graph is loaded on a background thread, started by the WSGI entry
+point or by the first access, and ``follows``/``suggestions`` answer from
+the database until it is ready. Committed follows and unfollows are
+recorded in the ``state`` cache as a numbered change log, which every
+process replays on its next access, so with a shared cache all processes
+converge without reloading. A process that falls too far behind, finds a change
+evicted or sees the cache cleared reloads the graph in the background.
+Compaction runs in the background too: the lock is only held to snapshot
+the overlays and to swap the rebuilt arrays in.
+
+``settings.FOLLOW_GRAPH_BACKGROUND = False`` loads and compacts in the
+calling thread.
+"""
+import functools
+import heapq
+import itertools
+import logging
+import os
+import threading
+import uuid
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, router, transaction
+
+from .models import Follow
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = 'follow_graph:sequence'
+EPOCH_KEY = 'follow_graph:epoch'
+CHANGE_TIMEOUT = 24 * 60 * 60
+# Past this many unseen changes a reload is cheaper than replaying them.
+MAX_REPLAY = 10000
+# Overlay changes tolerated per edge before the arrays are rebuilt.
+COMPACT_RATIO = 0.01
+MIN_COMPACT = 1000
+
+
+def change_key(number):
+    return f'follow_graph:change:{number}'
+
+
+class Adjacency:
+    """Sorted neighbour ids of every node, with an overlay of changes.
+
+    Overlay sets are replaced rather than mutated and compaction builds a
+    new object, so readers in other threads never see a half-made change.
+    """
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+        self.added = {}
+        self.removed = {}
+        self.changes = 0
+
+    @classmethod
+    def from_counts(cls, counts, targets):
+        offsets = array('q', [0])
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+        return cls(offsets, targets)
+
+    def _bounds(self, node):
+        if 0 <= node < len(self.offsets) - 1:
+            return self.offsets[node], self.offsets[node + 1]
+        return 0, 0
+
+    def _in_base(self, node, target):
+        low, high = self._bounds(node)
+        index = bisect_left(self.targets, target, low, high)
+        return index < high and self.targets[index] == target
+
+    def copy(self):
+        """A copy sharing the arrays, which are never changed in place."""
+        copy = Adjacency(self.offsets, self.targets)
+        copy.added, copy.removed = dict(self.added), dict(self.removed)
+        copy.changes = self.changes
+        return copy
+
+    def contains(self, node, target):
+        if target in self.added.get(node, ()):
+            return True
+        if target in self.removed.get(node, ()):
+            return False
+        return self._in_base(node, target)
+
+    def count(self, node):
+        low, high = self._bounds(node)
+        return (high - low - len(self.removed.get(node, ()))
+                + len(self.added.get(node, ())))
+
+    def neighbours(self, node):
+        low, high = self._bounds(node)
+        removed = self.removed.get(node, ())
+        for index in range(low, high):
+            if self.targets[index] not in removed:
+                yield self.targets[index]
+        yield from self.added.get(node, ())
+
+    def add(self, node, target):
+        if self.contains(node, target):
+            return False
+        if self._in_base(node, target):
+            self.removed[node] = self.removed[node] - {target}
+        else:
+            self.added[node] = self.added.get(node, frozenset()) | {target}
+        self.changes += 1
+        return True
+
+    def discard(self, node, target):
+        if not self.contains(node, target):
+            return False
+        if self._in_base(node, target):
+            self.removed[node] = (self.removed.get(node, frozenset())
+                                  | {target})
+        else:
+            self.added[node] = self.added[node] - {target}
+        self.changes += 1
+        return True
+
+    def compacted(self):
+        """A copy with the overlay folded back into the arrays."""
+        nodes = itertools.chain(range(len(self.offsets) - 1), self.added)
+        size = max(nodes, default=-1) + 1
+        offsets, targets = array('q', [0]), array('i')
+        for node in range(size):
+            if node in self.added or node in self.removed:
+                targets.extend(sorted(self.neighbours(node)))
+            else:
+                low, high = self._bounds(node)
+                targets.extend(self.targets[low:high])
+            offsets.append(len(targets))
+        return Adjacency(offsets, targets)
+
+    def nbytes(self):
+        return (self.offsets.itemsize * len(self.offsets)
+                + self.targets.itemsize * len(self.targets))
+
+
+class FollowGraph:
+    """Who follows whom, answered from memory."""
+
+    def __init__(self, pairs=()):
+        """Build the graph from ``(user_id, author_id)`` pairs.
+
+        The pairs must be sorted, as the ``unique_follow`` index returns
+        them. Followers come out sorted too: users are seen in order.
+        """
+        following_counts, followers_counts = array('q'), array('q')
+        users, authors = array('i'), array('i')
+        for user, author in pairs:
+            users.append(user)
+            authors.append(author)
+            for counts, node in ((following_counts, user),
+                                 (followers_counts, author)):
+                if node >= len(counts):
+                    counts.extend(itertools.repeat(
+                        0, node + 1 - len(counts)
+                    ))
+                counts[node] += 1
+        self.following = Adjacency.from_counts(following_counts, authors)
+        self.followers = Adjacency.from_counts(
+            followers_counts, array('i', bytes(len(users) * 4))
+        )
+        position = array('q', self.followers.offsets[:-1])
+        for user, author in zip(users, authors):
+            self.followers.targets[position[author]] = user
+            position[author] += 1
+        self.edges = len(users)
+        self.epoch = None
+        self.sequence = 0
+        # Changes made while a compaction is running, or None.
+        self.journal = None
+
+    def follows(self, user_id, author_id):
+        return self.following.contains(user_id, author_id)
+
+    def following_count(self, user_id):
+        return self.following.count(user_id)
+
+    def followers_count(self, author_id):
+        return self.followers.count(author_id)
+
+    def follow(self, user_id, author_id):
+        if self.following.add(user_id, author_id):
+            self.followers.add(author_id, user_id)
+            self.edges += 1
+            self._journal(True, user_id, author_id)
+
+    def unfollow(self, user_id, author_id):
+        if self.following.discard(user_id, author_id):
+            self.followers.discard(author_id, user_id)
+            self.edges -= 1
+            self._journal(False, user_id, author_id)
+
+    def _journal(self, *change):
+        if self.journal is not None:
+            self.journal.append(change)
+
+    def start_compaction(self):
+        """Copies of the adjacencies to compact, or ``None`` if not due.
+
+        Changes from now on are journaled until ``finish_compaction``.
+        """
+        limit = max(MIN_COMPACT, self.edges * COMPACT_RATIO)
+        if (self.journal is not None
+                or max(self.following.changes,
+                       self.followers.changes) <= limit):
+            return None
+        self.journal = []
+        return self.following.copy(), self.followers.copy()
+
+    def finish_compaction(self, following, followers):
+        """Swap in the compacted copies with the journal replayed."""
+        for followed, user_id, author_id in self.journal:
+            if followed:
+                following.add(user_id, author_id)
+                followers.add(author_id, user_id)
+            else:
+                following.discard(user_id, author_id)
+                followers.discard(author_id, user_id)
+        self.following, self.followers = following, followers
+        self.journal = None
+
+    def suggestions(self, user_id, limit=5, fanout=200):
+        """Authors followed by the authors ``user_id`` follows.
+
+        Ranked by how many of them follow the candidate, then by follower
+        count. Only ``fanout`` neighbours are read per user, which bounds
+        the cost for heavy followers.
+        """
+        followed = set(self.following.neighbours(user_id))
+        scores = Counter()
+        for author in itertools.islice(followed, fanout):
+            scores.update(itertools.islice(
+                self.following.neighbours(author), fanout
+            ))
+        for author in followed | {user_id}:
+            scores.pop(author, None)
+        best = heapq.nlargest(
+            limit, scores.items(),
+            key=lambda item: (item[1], self.followers_count(item[0]))
+        )
+        return [author for author, _ in best]
+
+    def nbytes(self):
+        return self.following.nbytes() + self.followers.nbytes()
+
+
+_graph = None
+# Id of the process loading the graph: a fork does not inherit the thread.
+_loader = None
+_lock = threading.Lock()
+
+
+def load():
+    """Read the ``Follow`` table into a new graph."""
+    cache = caches['state']
+    cache.add(EPOCH_KEY, uuid.uuid4().hex, None)
+    cache.add(SEQUENCE_KEY, 0, None)
+    state = cache.get_many([EPOCH_KEY, SEQUENCE_KEY])
+    # From the primary: rows a replica has not replayed yet would
+    # otherwise be missing for good.
+    pairs = (Follow.objects.using(router.db_for_write(Follow))
+             .order_by('user_id', 'author_id')
+             .values_list('user_id', 'author_id').iterator(chunk_size=10000))
+    graph = FollowGraph(pairs)
+    # Changes logged while reading are replayed; replaying is idempotent.
+    graph.epoch = state.get(EPOCH_KEY)
+    graph.sequence = state.get(SEQUENCE_KEY, 0)
+    return graph
+
+
+def sync(graph):
+    """Replay the changes logged since ``graph`` was last synced.
+
+    Returns ``False`` when that is not possible and the graph is stale.
+    """
+    cache = caches['state']
+    state = cache.get_many([EPOCH_KEY, SEQUENCE_KEY])
+    sequence = state.get(SEQUENCE_KEY, 0)
+    if state.get(EPOCH_KEY) != graph.epoch or sequence < graph.sequence:
+        return False
+    if sequence == graph.sequence:
+        return True
+    if sequence - graph.sequence > MAX_REPLAY:
+        return False
+    keys = [change_key(number)
+            for number in range(graph.sequence + 1, sequence + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return False
+    for key in keys:
+        apply(graph, *changes[key])
+    graph.sequence = sequence
+    return True
+
+
+def apply(graph, followed, user_id, author_id):
+    if followed:
+        graph.follow(user_id, author_id)
+    else:
+        graph.unfollow(user_id, author_id)
+
+
+def _run(function, *args):
+    if not settings.FOLLOW_GRAPH_BACKGROUND:
+        function(*args)
+        return
+
+    def target():
+        try:
+            function(*args)
+        finally:
+            connections.close_all()
+    threading.Thread(target=target, name='follow_graph', daemon=True).start()
+
+
+def start_loading():
+    """Load the graph unless it is loaded or already being loaded."""
+    global _loader
+    with _lock:
+        if _graph is not None or _loader == os.getpid():
+            return
+        _loader = os.getpid()
+    _run(_reload)
+
+
+def _reload():
+    global _graph, _loader
+    try:
+        fresh = load()
+    except Exception:
+        logger.exception('Loading the follow graph failed')
+        fresh = None
+    with _lock:
+        if fresh is not None:
+            _graph = fresh
+        _loader = None
+
+
+def _maybe_compact(graph):
+    with _lock:
+        copies = graph.start_compaction()
+    if copies is not None:
+        _run(_compact, graph, copies)
+
+
+def _compact(graph, copies):
+    compacted = [adjacency.compacted() for adjacency in copies]
+    with _lock:
+        graph.finish_compaction(*compacted)
+
+
+def graph():
+    """The process-wide graph brought up to date, ``None`` until loaded."""
+    global _graph
+    with _lock:
+        current = _graph
+        if current is not None and not sync(current):
+            current = _graph = None
+    if current is None:
+        start_loading()
+        return _graph
+    _maybe_compact(current)
+    return current
+
+
+def follows(user_id, author_id):
+    current = graph()
+    if current is None:
+        return Follow.objects.filter(user_id=user_id,
+                                     author_id=author_id).exists()
+    return current.follows(user_id, author_id)
+
+
+def suggestions(user_id):
+    current = graph()
+    if current is None:
+        return []
+    return current.suggestions(user_id)
+
+
+def record(followed, user_id, author_id):
+    """Once the transaction commits, log a follow (or unfollow) for every
+    process and apply it here."""
+    transaction.on_commit(functools.partial(
+        _publish, (followed, user_id, author_id)
+    ))
+
+
+def _publish(change):
+    cache = caches['state']
+    cache.add(EPOCH_KEY, uuid.uuid4().hex, None)
+    cache.add(SEQUENCE_KEY, 0, None)
+    try:
+        number = cache.incr(SEQUENCE_KEY)
+    except ValueError:
+        # Evicted in between; the epoch check makes readers reload.
+        return
+    cache.set(change_key(number), change, CHANGE_TIMEOUT)
+    with _lock:
+        current = _graph
+        if current is not None:
+            apply(current, *change)
+    if current is not None:
+        _maybe_compact(current)
+
+
+def reset():
+    """Drop this process's graph; the next access reloads it."""
+    global _graph, _loader
+    with _lock:
+        _graph = _loader = None
@@ -0,0 +1,105 @@
+"""Full-text search over post texts.
+
+Posts are indexed in the SQLite FTS5 table ``posts_post_fts`` (created in
+migration 0013) under their id, so a search is an inverted-index lookup
+ranked by BM25 instead of a ``LIKE '%…%'`` scan. The index is kept in
+step from the post signals; writes that bypass them (``bulk_create``,
+``update()``) need a ``rebuild_search_index`` afterwards.
+
+There is no Russian stemmer in FTS5, so every word of a query is matched
+as a prefix: ``пост`` also finds ``постов`` and ``постами``.
+"""
+import re
+
+from django.db import connection
+
+TABLE = 'posts_post_fts'
+
+
+def index(post):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post.pk])
+        cursor.execute(f'INSERT INTO {TABLE} (rowid, text) VALUES (%s, %s)',
+                       [post.pk, post.text])
+
+
+def unindex(post_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+
+
+def rebuild():
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.execute(f'INSERT INTO {TABLE} (rowid, text) '
+                       f'SELECT id, text FROM posts_post')
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+
+
+def match_expression(query):
+    # Only word characters survive, so the expression cannot break out
+    # of the quotes into FTS5 query syntax.
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def matching(queryset, query):
+    """Posts of ``queryset`` containing every word of ``query``."""
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    # Not pk__in=RawSQL(...): SQLite reads "IN ((SELECT ...))" as a
+    # one-element list and would return the first match only.
+    return queryset.extra(
+        where=[f'posts_post.id IN '
+               f'(SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s)'],
+        params=[expression],
+    )
+
+
+class RankedResults:
+    """Posts matching ``query``, best match first, sliceable by Paginator.
+
+    Ranking runs on the index alone (``ORDER BY rank`` is BM25 in FTS5)
+    and only the ids of the requested slice are then loaded from
+    ``queryset``; joining the index into the post query would make SQLite
+    run the ``MATCH`` once per post.
+    """
+
+    def __init__(self, queryset, query):
+        self.queryset = queryset
+        self.expression = match_expression(query)
+
+    def _fetch(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def count(self):
+        if not self.expression:
+            return 0
+        return self._fetch(
+            f'SELECT COUNT(*) FROM {TABLE} WHERE {TABLE} MATCH %s',
+            [self.expression]
+        )[0][0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.expression:
+            return []
+        start = index.start or 0
+        limit = -1 if index.stop is None else index.stop - start
+        ids = [pk for pk, in self._fetch(
+            f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s '
+            f'ORDER BY rank, rowid DESC LIMIT %s OFFSET %s',
+            [self.expression, limit, start]
+        )]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def ranked(queryset, query):
+    return RankedResults(queryset, query)
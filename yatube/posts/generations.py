@@ -0,0 +1,197 @@
+"""Generation counters for page caching.
+
+Each cached page is keyed by the generations of the content it shows: the
+whole site, a group or an author. Write paths bump the matching counters,
+which moves readers to fresh cache keys at once, so pages can be cached
+for a long time and still never be stale. A counter that is missing (or
+was evicted) restarts from the current time, never from a value that an
+old cached page could still be keyed with. Counters live in the
+``state`` cache alias, out of reach of the page cache's eviction.
+
+Counters are keyed by the id of the group or author, which survives
+renames and is safe in any cache key. The URLs of group and author pages
+carry the slug or username instead; their ids are cached too, under a
+digest of the name, and dropped by the signals on a rename or deletion.
+
+The same counters answer conditional GETs: the ETag of a page is a digest
+of its generations and of the viewer's cookies, so a 304 costs a cache
+lookup and no query at all. Unlike the newest ``pub_date`` they also move
+on edits, deletions and new comments.
+"""
+import datetime as dt
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+
+from yatube import replicas
+
+from .models import Group, User
+
+
+def site_key():
+    return 'generation:site'
+
+
+def group_key(group_id):
+    return f'generation:group:{group_id}'
+
+
+def author_key(author_id):
+    return f'generation:author:{author_id}'
+
+
+def id_key(kind, name):
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return f'generation:{kind}_id:{digest}'
+
+
+def _resolve(kind, queryset, name):
+    cache = caches['state']
+    key = id_key(kind, name)
+    pk = cache.get(key)
+    if pk is None:
+        pk = queryset.values_list('pk', flat=True).first()
+        # Unknown names are not cached: the name may be taken later.
+        if pk is not None:
+            cache.set(key, pk, None)
+    return pk
+
+
+def forget(kind, name):
+    caches['state'].delete(id_key(kind, name))
+
+
+def group_page_key(slug, **kwargs):
+    return group_key(_resolve('group', Group.objects.filter(slug=slug),
+                              slug))
+
+
+def author_page_key(username, **kwargs):
+    return author_key(_resolve(
+        'author', User.objects.filter(username=username), username
+    ))
+
+
+def post_page_key(username, post_id):
+    # The post, its comments and its author's counters all bump this.
+    return author_page_key(username)
+
+
+def archive_key(username=None, slug=None, **period):
+    # Archives of an author, of a group or of the whole site.
+    if username is not None:
+        return author_page_key(username)
+    if slug is not None:
+        return group_page_key(slug)
+    return site_key()
+
+
+def day_key():
+    # Moves at midnight, for pages that show the last few days.
+    return f'generation:day:{timezone.localdate()}'
+
+
+def modified_key(key):
+    return f'{key}:modified'
+
+
+def _get_or_init(keys, initial):
+    cache = caches['state']
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, initial(), None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+def current(keys):
+    return _get_or_init(keys, time.time_ns)
+
+
+def last_modified(keys):
+    """When any of ``keys`` was last bumped."""
+    stamps = _get_or_init([modified_key(key) for key in keys], time.time)
+    return dt.datetime.fromtimestamp(max(stamps), tz=dt.timezone.utc)
+
+
+def recently_bumped(keys):
+    age = time.time() - last_modified(keys).timestamp()
+    return age < settings.REPLICA_STICKY_SECONDS
+
+
+def bump(*keys):
+    cache = caches['state']
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+    now = time.time()
+    cache.set_many({modified_key(key): now for key in keys}, None)
+
+
+def post_keys(post, group_ids=()):
+    """Generation keys of every page showing ``post``.
+
+    ``group_ids`` are extra groups whose pages showed the post before an
+    edit moved it elsewhere.
+    """
+    keys = [site_key(), author_key(post.author_id)]
+    group_ids = {post.group_id, *group_ids} - {None}
+    keys.extend(group_key(group_id) for group_id in sorted(group_ids))
+    return keys
+
+
+def cache_page_by_generation(*scopes):
+    """Cache a view for ``settings.PAGE_CACHE_TIMEOUT`` per generation.
+
+    ``scopes`` are callables receiving the view kwargs and returning a
+    generation key; the current generations become part of the cache key.
+    Pages vary on the cookie, as they show the viewer's name and controls.
+    Within ``settings.REPLICA_STICKY_SECONDS`` of a bump, replicas may not
+    have the change yet, so the page for the new generation is rendered
+    from the primary.
+    """
+    def decorator(view):
+        view = vary_on_cookie(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            keys = [scope(**kwargs) for scope in scopes]
+            prefix = '.'.join(
+                [wrapper.__name__] + [str(gen) for gen in current(keys)]
+            )
+            cached_view = cache_page(settings.PAGE_CACHE_TIMEOUT,
+                                     key_prefix=prefix)(view)
+            if settings.DATABASE_REPLICAS and recently_bumped(keys):
+                with replicas.primary():
+                    return cached_view(request, *args, **kwargs)
+            return cached_view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def condition_by_generation(*scopes):
+    """Answer conditional GETs of a view from the generations of ``scopes``.
+
+    Goes outside ``cache_page_by_generation``, so a 304 skips the cache
+    too. The ETag covers the cookies, as the page cache does. There is no
+    ``Last-Modified``: at one second resolution and the same for every
+    viewer it would answer 304 after a login or a second write within the
+    same second.
+    """
+    def etag(request, *args, **kwargs):
+        parts = [request.get_full_path(), request.META.get('HTTP_COOKIE', '')]
+        keys = [scope(**kwargs) for scope in scopes]
+        parts.extend(str(gen) for gen in current(keys))
+        return hashlib.md5('\x1f'.join(parts).encode()).hexdigest()
+
+    return condition(etag_func=etag)
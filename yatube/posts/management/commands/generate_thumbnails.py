@@ -0,0 +1,37 @@
+from concurrent import futures
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Generate the missing thumbnails of existing post images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Threads to use, 0 to run inline.')
+
+    def handle(self, *args, **options):
+        post_ids = list(Post.objects.exclude(image='').exclude(image=None)
+                        .values_list('pk', flat=True))
+
+        def generate(post_id):
+            try:
+                return thumbnails.generate(post_id)
+            except Exception as error:
+                self.stderr.write(f'Post {post_id}: {error}')
+                return 0
+            finally:
+                connections.close_all()
+
+        if options['workers']:
+            with futures.ThreadPoolExecutor(options['workers']) as executor:
+                created = sum(executor.map(generate, post_ids))
+        else:
+            created = sum(map(thumbnails.generate, post_ids))
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {created} thumbnails for {len(post_ids)} posts.'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import fulltext
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of post texts.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fulltext.rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import timeline
+from posts.models import Follow, TimelineEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized follow timelines from the Follow table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*',
+                            help='Only rebuild timelines of these users.')
+
+    def handle(self, *args, **options):
+        # Readers who follow nobody any more may still have stale entries.
+        followers = Follow.objects.values_list('user_id', flat=True)
+        readers = TimelineEntry.objects.values_list('user_id', flat=True)
+        if options['usernames']:
+            followers = followers.filter(
+                user__username__in=options['usernames']
+            )
+            readers = readers.filter(user__username__in=options['usernames'])
+        user_ids = sorted(set(followers) | set(readers.distinct()))
+        for user_id in user_ids:
+            with transaction.atomic():
+                timeline.rebuild(user_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(user_ids)} timelines.'
+        ))
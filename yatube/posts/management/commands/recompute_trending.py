@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = ('Recompute the trending scores of all posts from their comments '
+            'and reset the cached ranking.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            trending.recompute()
+        self.stdout.write(self.style.SUCCESS('Trending scores recomputed.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = ('Recompute the group directory statistics and the last days of '
+            'group activity from the posts. Run it daily, after midnight.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counters.recount_groups(Group.objects.all())
+        self.stdout.write(self.style.SUCCESS('Group statistics reconciled.'))
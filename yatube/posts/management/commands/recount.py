@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import archive, counters
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = ('Recompute the stored comment, post, follower, following, group '
+            'and monthly archive counters from the source tables.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counters.recount_comments()
+            counters.recount_users(User.objects.all())
+            counters.recount_groups(Group.objects.all())
+            archive.recount()
+        self.stdout.write(self.style.SUCCESS('Counters recounted.'))
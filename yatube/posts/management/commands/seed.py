@@ -0,0 +1,204 @@
+import contextlib
+import datetime as dt
+import itertools
+import random
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts import archive, counters, fulltext, trending
+from posts.models import Comment, Follow, Group, Post, User
+
+WORDS = (
+    'пост сообщество автор подписка новость день город утро вечер код '
+    'питон джанго база запрос индекс кэш лента друг фото путешествие '
+    'книга музыка кино спорт погода работа отдых идея проект команда '
+    'релиз тест ошибка исправление скорость память диск сеть сервер'
+).split()
+
+
+@contextlib.contextmanager
+def explicit_dates(*fields):
+    """Let ``bulk_create`` keep the given ``auto_now_add`` values."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def zipf_weights(count, skew, rng):
+    """Cumulative Zipf weights over ``count`` items in random rank order."""
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return list(itertools.accumulate(1 / rank ** skew for rank in ranks))
+
+
+class Command(BaseCommand):
+    help = ('Fill the database with synthetic users, groups, posts, '
+            'comments and follows for load testing.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--comments', type=int, default=300000)
+        parser.add_argument('--follows', type=int, default=300000)
+        parser.add_argument('--days', type=int, default=730,
+                            help='Spread publication dates over this span.')
+        parser.add_argument('--post-skew', type=float, default=1.1,
+                            help='Zipf exponent of posts per author.')
+        parser.add_argument('--follow-skew', type=float, default=1.3,
+                            help='Zipf exponent of followers per author.')
+        parser.add_argument('--comment-skew', type=float, default=1.2,
+                            help='Zipf exponent of comments per post.')
+        parser.add_argument('--group-ratio', type=float, default=0.6,
+                            help='Share of posts published in a group.')
+        parser.add_argument('--chunk', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--skip-derived', action='store_true',
+                            help='Do not rebuild counters and timelines.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        with transaction.atomic():
+            users = self.create_users()
+            groups = self.create_groups()
+            posts = self.create_posts(users, groups)
+            self.create_comments(users, posts)
+            self.create_follows(users)
+        if not options['skip_derived']:
+            self.rebuild_derived(users, groups)
+
+    def log(self, message):
+        self.stdout.write(f'[{timezone.now() - self.now}] {message}')
+
+    def chunks(self, objects):
+        iterator = iter(objects)
+        chunk = list(itertools.islice(iterator, self.options['chunk']))
+        while chunk:
+            yield chunk
+            chunk = list(itertools.islice(iterator, self.options['chunk']))
+
+    def text(self, low, high):
+        words = self.rng.choices(WORDS, k=self.rng.randint(low, high))
+        return ' '.join(words).capitalize()
+
+    def create_users(self):
+        prefix = f'seed{self.options["seed"]}_'
+        first = User.objects.filter(username__startswith=prefix).count()
+        for chunk in self.chunks(
+            User(username=f'{prefix}{number}', password='!')
+            for number in range(first, first + self.options['users'])
+        ):
+            User.objects.bulk_create(chunk)
+        users = list(User.objects.filter(username__startswith=prefix)
+                     .order_by('pk').values_list('pk', flat=True))[first:]
+        self.log(f'{len(users)} users')
+        return users
+
+    def create_groups(self):
+        prefix = f'seed{self.options["seed"]}-'
+        first = Group.objects.filter(slug__startswith=prefix).count()
+        Group.objects.bulk_create(
+            Group(title=f'Сообщество {number}', slug=f'{prefix}{number}',
+                  description=self.text(5, 20))
+            for number in range(first, first + self.options['groups'])
+        )
+        groups = list(Group.objects.filter(slug__startswith=prefix)
+                      .order_by('pk').values_list('pk', flat=True))[first:]
+        self.log(f'{len(groups)} groups')
+        return groups
+
+    def dates(self, count):
+        span = dt.timedelta(days=self.options['days']).total_seconds()
+        offsets = sorted(self.rng.uniform(0, span) for _ in range(count))
+        start = self.now - dt.timedelta(seconds=span)
+        return (start + dt.timedelta(seconds=offset) for offset in offsets)
+
+    def create_posts(self, users, groups):
+        count = self.options['posts']
+        weights = zipf_weights(len(users), self.options['post_skew'],
+                               self.rng)
+        authors = self.rng.choices(users, cum_weights=weights, k=count)
+        ratio = self.options['group_ratio']
+        posts = (
+            Post(author_id=author, pub_date=pub_date, text=self.text(5, 60),
+                 group_id=(self.rng.choice(groups)
+                           if groups and self.rng.random() < ratio
+                           else None))
+            for author, pub_date in zip(authors, self.dates(count))
+        )
+        first = Post.objects.order_by('-pk').values_list('pk', flat=True)
+        first = (first.first() or 0) + 1
+        with explicit_dates(Post._meta.get_field('pub_date')):
+            for chunk in self.chunks(posts):
+                Post.objects.bulk_create(chunk)
+        posts = list(Post.objects.filter(pk__gte=first)
+                     .order_by('pk').values_list('pk', 'pub_date'))
+        self.log(f'{len(posts)} posts')
+        return posts
+
+    def create_comments(self, users, posts):
+        if not posts:
+            return
+        count = self.options['comments']
+        weights = zipf_weights(len(posts), self.options['comment_skew'],
+                               self.rng)
+        targets = self.rng.choices(posts, cum_weights=weights, k=count)
+
+        def comments():
+            for post_id, pub_date in targets:
+                delay = dt.timedelta(seconds=self.rng.expovariate(1 / 86400))
+                yield Comment(post_id=post_id,
+                              author_id=self.rng.choice(users),
+                              text=self.text(2, 25),
+                              created=min(pub_date + delay, self.now))
+
+        with explicit_dates(Comment._meta.get_field('created')):
+            for chunk in self.chunks(comments()):
+                Comment.objects.bulk_create(chunk)
+        self.log(f'{count} comments')
+
+    def create_follows(self, users):
+        count = min(self.options['follows'], len(users) * (len(users) - 1))
+        weights = zipf_weights(len(users), self.options['follow_skew'],
+                               self.rng)
+        pairs = set()
+        while len(pairs) < count:
+            authors = self.rng.choices(users, cum_weights=weights,
+                                       k=count - len(pairs))
+            pairs.update((self.rng.choice(users), author)
+                         for author in authors)
+            pairs = {(user, author) for user, author in pairs
+                     if user != author}
+        for chunk in self.chunks(Follow(user_id=user, author_id=author)
+                                 for user, author in sorted(pairs)):
+            Follow.objects.bulk_create(chunk)
+        self.log(f'{len(pairs)} follows')
+
+    def rebuild_derived(self, users, groups):
+        # bulk_create sends no signals: rebuild what they would maintain.
+        with transaction.atomic():
+            counters.recount_comments()
+            counters.recount_users(User.objects.filter(pk__in=users))
+            counters.recount_groups(Group.objects.filter(pk__in=groups))
+            archive.recount()
+        self.log('counters recounted')
+        call_command('rebuild_timelines', stdout=self.stdout)
+        self.log('timelines rebuilt')
+        with transaction.atomic():
+            fulltext.rebuild()
+        self.log('search index rebuilt')
+        with transaction.atomic():
+            trending.recompute()
+        self.log('trending scores recomputed')
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS('Seeding finished.'))
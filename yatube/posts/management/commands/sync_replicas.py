@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from yatube.replicas import copy_database
+
+
+class Command(BaseCommand):
+    help = ('Copy the primary SQLite database over every replica in '
+            'DATABASE_REPLICAS, for local testing.')
+
+    def handle(self, *args, **options):
+        for alias in settings.DATABASE_REPLICAS:
+            copy_database(DEFAULT_DB_ALIAS, alias)
+            self.stdout.write(f'{alias} synced')
+        self.stdout.write(self.style.SUCCESS('Replicas synced.'))
@@ -0,0 +1,88 @@
+# Generated by Django 2.2.6 on 2026-10-18 03:08
+
+import datetime as dt
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupActivity = apps.get_model('posts', 'GroupActivity')
+    GroupStats.objects.bulk_create(
+        GroupStats(group_id=group.pk, posts_count=group.posts_total,
+                   last_post_at=group.last_post)
+        for group in Group.objects.annotate(
+            posts_total=models.Count('posts'),
+            last_post=models.Max('posts__pub_date'),
+        )
+    )
+    # The window of posts.counters.activity_since().
+    since = (timezone.localdate()
+             - dt.timedelta(days=settings.GROUP_ACTIVITY_DAYS - 1))
+    GroupActivity.objects.bulk_create(
+        GroupActivity(group_id=row['group'], day=row['day'],
+                      posts_count=row['total'])
+        for row in Post.objects.filter(
+            group__isnull=False, pub_date__date__gte=since
+        ).annotate(day=TruncDate('pub_date')).order_by().values(
+            'group', 'day'
+        ).annotate(total=models.Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_indexes_follow_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+            ],
+            options={
+                'verbose_name': 'Активность сообщества',
+                'verbose_name_plural': 'Активность сообществ',
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Сообщество')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+                ('last_post_at', models.DateTimeField(blank=True, null=True, verbose_name='Последняя запись')),
+            ],
+            options={
+                'verbose_name': 'Статистика сообщества',
+                'verbose_name_plural': 'Статистика сообществ',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['-last_post_at'], name='groupstats_last_post_idx'),
+        ),
+        migrations.AddField(
+            model_name='groupactivity',
+            name='group',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='posts.Group', verbose_name='Сообщество'),
+        ),
+        migrations.AddIndex(
+            model_name='groupactivity',
+            index=models.Index(fields=['day'], name='groupactivity_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupactivity',
+            constraint=models.UniqueConstraint(fields=('group', 'day'), name='unique_group_activity_day'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 2.2.6 on 2026-10-18 03:11
+
+import math
+
+from django.db import migrations, models
+
+# A frozen copy of the scoring in posts.trending, with the
+# TRENDING_HALF_LIFE of the time; after changing either, run
+# recompute_trending instead of editing this migration.
+EPOCH = 1577836800
+HALF_LIFE = 6 * 60 * 60
+POST_WEIGHT = 0.05
+CHUNK = 1000
+
+
+def weight(moment):
+    return (moment.timestamp() - EPOCH) * math.log(2) / HALF_LIFE
+
+
+def fill_trending_score(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    scores = {post_id: weight(pub_date) + math.log(POST_WEIGHT)
+              for post_id, pub_date
+              in Post.objects.values_list('pk', 'pub_date').iterator()}
+    for post_id, created in Comment.objects.values_list(
+        'post_id', 'created'
+    ).iterator():
+        high, low = sorted((scores[post_id], weight(created)), reverse=True)
+        scores[post_id] = high + math.log1p(math.exp(low - high))
+    items = list(scores.items())
+    for start in range(0, len(items), CHUNK):
+        Post.objects.bulk_update(
+            [Post(pk=post_id, trending_score=score)
+             for post_id, score in items[start:start + CHUNK]],
+            ['trending_score']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_group_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Популярность'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-trending_score'], name='post_trending_idx'),
+        ),
+        migrations.RunPython(fill_trending_score, migrations.RunPython.noop),
+    ]
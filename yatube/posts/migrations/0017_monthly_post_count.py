@@ -0,0 +1,59 @@
+# Generated by Django 2.2.6 on 2026-10-18 03:14
+
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+def fill_monthly_post_counts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    MonthlyPostCount = apps.get_model('posts', 'MonthlyPostCount')
+    posts = Post.objects.annotate(
+        month=TruncMonth('pub_date', output_field=models.DateField())
+    ).order_by()
+    counts = [
+        MonthlyPostCount(scope='site', month=row['month'],
+                         posts_count=row['total'])
+        for row in posts.values('month').annotate(total=models.Count('pk'))
+    ]
+    counts.extend(
+        MonthlyPostCount(scope=f'author:{row["author"]}', month=row['month'],
+                         posts_count=row['total'])
+        for row in posts.values('author', 'month')
+        .annotate(total=models.Count('pk'))
+    )
+    counts.extend(
+        MonthlyPostCount(scope=f'group:{row["group"]}', month=row['month'],
+                         posts_count=row['total'])
+        for row in posts.filter(group__isnull=False).values('group', 'month')
+        .annotate(total=models.Count('pk'))
+    )
+    MonthlyPostCount.objects.bulk_create(counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPostCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=40, verbose_name='Раздел')),
+                ('month', models.DateField(verbose_name='Месяц')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Записей')),
+            ],
+            options={
+                'verbose_name': 'Записи за месяц',
+                'verbose_name_plural': 'Записи по месяцам',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlypostcount',
+            constraint=models.UniqueConstraint(fields=('scope', 'month'), name='unique_monthly_post_count'),
+        ),
+        migrations.RunPython(fill_monthly_post_counts,
+                             migrations.RunPython.noop),
+    ]
@@ -32,9 +32,23 @@ class Post(models.Model):
                               verbose_name='Сообщество',
                               help_text='Выберите сообщество')
     image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    comment_count = models.PositiveIntegerField('Комментариев', default=0,
+                                                editable=False)
+    trending_score = models.FloatField('Популярность', default=0,
+                                       editable=False)
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_pub_date_idx'),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=['-trending_score'],
+                         name='post_trending_idx'),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -52,15 +66,118 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(fields=['post', '-created', '-id'],
+                         name='comment_post_created_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
 
 class Follow(models.Model):
-    UniqueConstraint(fields=['user', 'author'],
-                     name='unique_fields')
     user = models.ForeignKey(User, on_delete=models.CASCADE,
                              related_name='follower')
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name='following')
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['user', 'author'],
+                             name='unique_follow'),
+        ]
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                primary_key=True, related_name='stats',
+                                verbose_name='Пользователь')
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(Group, on_delete=models.CASCADE,
+                                 primary_key=True, related_name='stats',
+                                 verbose_name='Сообщество')
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+    last_post_at = models.DateTimeField('Последняя запись', blank=True,
+                                        null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-last_post_at'],
+                         name='groupstats_last_post_idx'),
+        ]
+        verbose_name = 'Статистика сообщества'
+        verbose_name_plural = 'Статистика сообществ'
+
+    def __str__(self):
+        return str(self.group)
+
+
+class GroupActivity(models.Model):
+    group = models.ForeignKey(Group, on_delete=models.CASCADE,
+                              related_name='activity',
+                              verbose_name='Сообщество')
+    day = models.DateField('День')
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['group', 'day'],
+                             name='unique_group_activity_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='groupactivity_day_idx'),
+        ]
+        verbose_name = 'Активность сообщества'
+        verbose_name_plural = 'Активность сообществ'
+
+    def __str__(self):
+        return f'{self.group} {self.day}'
+
+
+class MonthlyPostCount(models.Model):
+    """Posts per month of the site (``site``), of a group (``group:<id>``)
+    or of an author (``author:<id>``), for the archive navigation."""
+    scope = models.CharField('Раздел', max_length=40)
+    month = models.DateField('Месяц')
+    posts_count = models.PositiveIntegerField('Записей', default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['scope', 'month'],
+                             name='unique_monthly_post_count'),
+        ]
+        verbose_name = 'Записи за месяц'
+        verbose_name_plural = 'Записи по месяцам'
+
+    def __str__(self):
+        return f'{self.scope} {self.month:%Y-%m}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='timeline')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='timeline_entries')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-post'],
+                         name='timeline_user_pub_date_idx'),
+        ]
+        constraints = [
+            UniqueConstraint(fields=['user', 'post'],
+                             name='unique_timeline_entry'),
+        ]
@@ -0,0 +1,120 @@
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+def get_page_or_404(paginator, number):
+    """Page ``number`` (the first by default) of a numbered paginator."""
+    try:
+        return paginator.page(number or 1)
+    except InvalidPage:
+        raise Http404('Нет такой страницы.')
+
+
+class CursorPaginator(Paginator):
+    """Keyset paginator for feeds ordered newest first.
+
+    A page is addressed by an opaque ``?after=``/``?before=`` cursor built
+    from the ``(pub_date, id)`` of its edge rows, so fetching any page is a
+    single range scan: no ``COUNT(*)`` and no ``OFFSET``. Old ``?page=N``
+    links still work; the pages they return carry cursors too, so
+    navigation switches to keyset pagination after the first hop. A
+    ``?page`` that is not a number or is past the end raises ``Http404``.
+
+    The returned pages are plain ``Page`` objects with two extra
+    attributes, ``next_cursor`` and ``previous_cursor``. Keyset pages do
+    not know their position in the feed, their ``number`` is ``None``.
+    ``count`` and ``num_pages`` still work but cost a ``COUNT(*)``.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('pub_date', 'id')):
+        self.ordering = ordering
+        super().__init__(self._ordered(object_list), per_page)
+
+    def get_page(self, params):
+        after = self.decode_cursor(params.get('after'))
+        if after is not None:
+            return self._keyset_page(after, older=True)
+        before = self.decode_cursor(params.get('before'))
+        if before is not None:
+            return self._keyset_page(before, older=False)
+        return self._offset_page(params.get('page'))
+
+    def encode_cursor(self, row):
+        value, pk = (self._value(row, field) for field in self.ordering)
+        return urlsafe_base64_encode(force_bytes(f'{value.isoformat()}|{pk}'))
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            value, pk = urlsafe_base64_decode(cursor).decode().split('|')
+            value, pk = parse_datetime(value), int(pk)
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if value is None:
+            return None
+        return value, pk
+
+    def _value(self, row, field):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
+
+    def _ordered(self, object_list=None, descending=True):
+        if object_list is None:
+            object_list = self.object_list
+        sign = '-' if descending else ''
+        return object_list.order_by(
+            *(sign + field for field in self.ordering)
+        )
+
+    def _keyset_query(self, cursor, older):
+        (value_field, pk_field), (value, pk) = self.ordering, cursor
+        lookup = 'lt' if older else 'gt'
+        # The redundant lte/gte bound lets the index seek to the cursor
+        # instead of scanning from the start of the feed.
+        return self._ordered(descending=older).filter(
+            Q(**{f'{value_field}__{lookup}e': value}),
+            Q(**{f'{value_field}__{lookup}': value})
+            | Q(**{f'{pk_field}__{lookup}': pk})
+        )[:self.per_page + 1]
+
+    def _keyset_page(self, cursor, older):
+        rows = list(self._keyset_query(cursor, older))
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if older:
+            return self._build_page(rows, None, has_next=has_more,
+                                    has_previous=True)
+        rows.reverse()
+        return self._build_page(rows, None, has_next=True,
+                                has_previous=has_more)
+
+    def _offset_page(self, number):
+        try:
+            number = int(number or 1)
+        except (TypeError, ValueError):
+            number = 0
+        if number < 1:
+            raise Http404('Нет такой страницы.')
+        offset = (number - 1) * self.per_page
+        rows = list(self._ordered()[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            raise Http404('Нет такой страницы.')
+        return self._build_page(rows[:self.per_page], number,
+                                has_next=len(rows) > self.per_page,
+                                has_previous=number > 1)
+
+    def _build_page(self, rows, number, has_next, has_previous):
+        page = self._get_page(rows, number, self)
+        page.next_cursor = (
+            self.encode_cursor(rows[-1]) if rows and has_next else None
+        )
+        page.previous_cursor = (
+            self.encode_cursor(rows[0]) if rows and has_previous else None
+        )
+        return page
@@ -0,0 +1,133 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import (archive, counters, follow_graph, fulltext, generations,
+               timeline, trending)
+from .models import Comment, Follow, Group, GroupStats, Post, User, UserStats
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    if created:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=User)
+def user_changing(sender, instance, update_fields=None, **kwargs):
+    # Logins only save last_login.
+    if instance.pk and (update_fields is None or 'username' in update_fields):
+        for username in User.objects.filter(pk=instance.pk).values_list(
+            'username', flat=True
+        ):
+            generations.forget('author', username)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    generations.forget('author', instance.username)
+
+
+@receiver(pre_save, sender=Post)
+def post_changing(sender, instance, **kwargs):
+    instance._previous_group_ids = set(
+        Post.objects.filter(pk=instance.pk).values_list('group_id', flat=True)
+    ) if instance.pk else set()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    generations.bump(*generations.post_keys(
+        instance, getattr(instance, '_previous_group_ids', ())
+    ))
+    fulltext.index(instance)
+    previous = getattr(instance, '_previous_group_ids', set()) - {None}
+    for group_id in previous - {instance.group_id}:
+        counters.bump_group(group_id, instance.pub_date, -1)
+        archive.bump([archive.group_scope(group_id)], instance.pub_date, -1)
+    if created:
+        counters.bump_user(instance.author_id, 'posts_count', 1)
+        timeline.fan_out(instance)
+        trending.record_post(instance)
+        archive.bump(archive.scopes(instance), instance.pub_date, 1)
+    if instance.group_id and instance.group_id not in previous:
+        counters.bump_group(instance.group_id, instance.pub_date, 1)
+        if not created:
+            archive.bump([archive.group_scope(instance.group_id)],
+                         instance.pub_date, 1)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    generations.bump(*generations.post_keys(instance))
+    counters.bump_user(instance.author_id, 'posts_count', -1)
+    if instance.group_id:
+        counters.bump_group(instance.group_id, instance.pub_date, -1)
+    archive.bump(archive.scopes(instance), instance.pub_date, -1)
+    fulltext.unindex(instance.pk)
+    trending.discard(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_comments(instance.post_id, 1)
+        trending.record_comment(instance)
+        generations.bump(*generations.post_keys(instance.post))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump_comments(instance.post_id, -1)
+    post = Post.objects.filter(pk=instance.post_id).first()
+    if post is not None:
+        generations.bump(*generations.post_keys(post))
+
+
+@receiver(pre_save, sender=Group)
+def group_changing(sender, instance, **kwargs):
+    if instance.pk:
+        for slug in Group.objects.filter(pk=instance.pk).values_list(
+            'slug', flat=True
+        ):
+            generations.forget('group', slug)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    generations.forget('group', instance.slug)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    keys = [generations.site_key(), generations.group_key(instance.pk)]
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+    else:
+        # Profiles and post pages show the group title too.
+        authors = Post.objects.filter(group=instance).values_list(
+            'author_id', flat=True
+        ).distinct()
+        keys.extend(generations.author_key(author_id) for author_id
+                    in authors.order_by())
+    generations.bump(*keys)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_user(instance.user_id, 'following_count', 1)
+        counters.bump_user(instance.author_id, 'followers_count', 1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        follow_graph.record(True, instance.user_id, instance.author_id)
+        generations.bump(generations.author_key(instance.user_id),
+                         generations.author_key(instance.author_id))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.bump_user(instance.user_id, 'following_count', -1)
+    counters.bump_user(instance.author_id, 'followers_count', -1)
+    timeline.prune(instance.user_id, instance.author_id)
+    follow_graph.record(False, instance.user_id, instance.author_id)
+    generations.bump(generations.author_key(instance.user_id),
+                     generations.author_key(instance.author_id))
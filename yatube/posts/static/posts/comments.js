@@ -0,0 +1,16 @@
+// Replace the "more comments" link with the next batch of comments.
+$(document).on('click', '.js-more-comments', function (event) {
+  var link = $(this);
+  event.preventDefault();
+  if (link.hasClass('disabled')) {
+    return;
+  }
+  link.addClass('disabled');
+  $.get(link.data('fragment'))
+    .done(function (html) {
+      link.replaceWith(html);
+    })
+    .fail(function () {
+      window.location = link.attr('href');
+    });
+});
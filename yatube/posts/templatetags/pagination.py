@@ -0,0 +1,18 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def query(context, **params):
+    """The current query string with ``params`` replaced.
+
+    A ``None`` value drops the parameter, so a cursor link can swap
+    ``after`` for ``before`` and keep ``q`` or any other filter.
+    """
+    query = context['request'].GET.copy()
+    for name, value in params.items():
+        query.pop(name, None)
+        if value is not None:
+            query[name] = value
+    return query.urlencode()
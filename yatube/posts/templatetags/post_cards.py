@@ -0,0 +1,87 @@
+"""Fragment cache for the viewer-independent part of post cards.
+
+A card is cached under the post id plus a digest of everything it shows,
+so editing the post, renaming its group or adding a comment yields a new
+key and stale fragments simply expire. Per-viewer parts of the card stay
+in ``includes/post_item.html`` and are never cached. Neither are cards
+whose image thumbnail is still being generated.
+"""
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts import thumbnails
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def card_key(post):
+    group = post.group
+    parts = [post.text, str(post.image), str(post.comment_count),
+             post.author.username,
+             group.slug if group else '', group.title if group else '']
+    version = hashlib.md5('\x1f'.join(parts).encode()).hexdigest()
+    return f'post_card:{post.pk}:{version}'
+
+
+def render_card(post):
+    return render_to_string(CARD_TEMPLATE, {'post': post})
+
+
+@register.simple_tag
+def prefetch_post_cards(posts):
+    """Attach cached cards to ``posts`` with a single ``get_many``."""
+    posts = {card_key(post): post for post in posts}
+    cached = cache.get_many(posts.keys())
+    rendered = {}
+    for key, post in posts.items():
+        post.card_html = cached.get(key)
+        if post.card_html is None:
+            post.card_html = render_card(post)
+            if not getattr(post, 'image_pending', False):
+                rendered[key] = post.card_html
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT)
+    return ''
+
+
+@register.simple_tag
+def post_card(post):
+    html = getattr(post, 'card_html', None)
+    if html is None:
+        key = card_key(post)
+        html = cache.get(key)
+        if html is None:
+            html = render_card(post)
+            if not getattr(post, 'image_pending', False):
+                cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+def srcset(images):
+    return ', '.join(f'{image.url} {image.width}w' for image in images)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post):
+    # One <source> per format, the last format is the <img> fallback.
+    images = thumbnails.lookup(post.image)
+    post.image_pending = images is None
+    context = {'post': post, 'size': settings.POST_IMAGE_SIZE}
+    if images is None:
+        return context
+    *formats, fallback = settings.POST_IMAGE_FORMATS
+    context.update({
+        'sources': [(f'image/{image_format.lower()}',
+                     srcset(images[image_format]))
+                    for image_format in formats],
+        'srcset': srcset(images[fallback]),
+        'image': images[fallback][-1],
+    })
+    return context
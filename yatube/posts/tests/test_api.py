@@ -0,0 +1,118 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class APITests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {number}',
+                                group=cls.group if number % 2 else None)
+            for number in range(15)
+        ]
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.comment = Comment.objects.create(post=cls.posts[-1],
+                                             author=cls.reader,
+                                             text='Комментарий')
+
+    def get(self, url, client=None, **params):
+        response = (client or self.client).get(url, params)
+        content = b''.join(response.streaming_content) if (
+            response.streaming) else response.content
+        return response, json.loads(content)
+
+    def test_index_pages(self):
+        response, data = self.get(reverse('api:index'))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual([post['text'] for post in data['results']],
+                         [f'Пост {number}' for number in range(14, 4, -1)])
+        self.assertEqual(data['results'][0]['author'], 'Author')
+        self.assertIsNone(data['previous'])
+        _, data = self.get(data['next'])
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNone(data['next'])
+        _, data = self.get(data['previous'])
+        self.assertEqual(data['results'][0]['text'], 'Пост 14')
+
+    def test_sparse_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            _, data = self.get(reverse('api:index'), fields='id,text',
+                               limit=2)
+        self.assertEqual(data['results'][0],
+                         {'id': self.posts[-1].pk, 'text': 'Пост 14'})
+        self.assertNotIn('auth_user', queries[-1]['sql'])
+        self.assertIn('limit=2', data['next'])
+        self.assertIn('fields=id%2Ctext', data['next'])
+
+    def test_page_out_of_range(self):
+        for page in (0, 99, 'last'):
+            with self.subTest(page=page):
+                response, data = self.get(reverse('api:index'), page=page)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(data, {'detail': 'Not found.'})
+
+    def test_unknown_field(self):
+        response, data = self.get(reverse('api:index'), fields='id,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', data['detail'])
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_limit_is_capped(self):
+        _, data = self.get(reverse('api:index'), limit=50)
+        self.assertEqual(len(data['results']), 3)
+
+    def test_group_and_profile(self):
+        _, data = self.get(reverse('api:group_posts',
+                                   kwargs={'slug': 'group'}))
+        self.assertTrue(all(post['group'] == 'group'
+                            for post in data['results']))
+        self.assertEqual(len(data['results']), 7)
+        _, data = self.get(reverse('api:profile',
+                                   kwargs={'username': 'Reader'}))
+        self.assertEqual(data['results'], [])
+        response, _ = self.get(reverse('api:profile',
+                                       kwargs={'username': 'Nobody'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_follow_index(self):
+        response, _ = self.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, 401)
+        client = Client()
+        client.force_login(self.reader)
+        _, data = self.get(reverse('api:follow_index'), client,
+                           fields='id')
+        self.assertEqual([post['id'] for post in data['results']],
+                         [post.pk for post in self.posts[:4:-1]])
+        _, data = self.get(data['next'], client)
+        self.assertEqual(len(data['results']), 5)
+
+    def test_post_and_comments(self):
+        post = self.posts[-1]
+        _, data = self.get(reverse('api:post', kwargs={'post_id': post.pk}))
+        self.assertEqual(data['comment_count'], 1)
+        self.assertIsNone(data['image'])
+        _, data = self.get(reverse('api:comments',
+                                   kwargs={'post_id': post.pk}))
+        self.assertEqual(data['results'][0]['text'], 'Комментарий')
+        self.assertEqual(data['results'][0]['author'], 'Reader')
+        response, _ = self.get(reverse('api:post', kwargs={'post_id': 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_read_only(self):
+        response = self.client.post(reverse('api:index'))
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,130 @@
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import archive
+from posts.models import Group, MonthlyPostCount, Post
+
+User = get_user_model()
+
+
+def moment(*args):
+    return timezone.make_aware(dt.datetime(*args))
+
+
+class MonthlyCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(title='Сообщество', slug='group',
+                                         description='Описание')
+        cls.other = Group.objects.create(title='Другое', slug='other',
+                                         description='Описание')
+
+    def counts(self):
+        return dict(MonthlyPostCount.objects.filter(posts_count__gt=0)
+                    .values_list('scope', 'posts_count'))
+
+    def test_counts_follow_posts(self):
+        post = Post.objects.create(author=self.author, text='Пост',
+                                   group=self.group)
+        self.assertEqual(self.counts(), {
+            'site': 1,
+            f'author:{self.author.pk}': 1,
+            f'group:{self.group.pk}': 1,
+        })
+        post.group = self.other
+        post.save()
+        self.assertEqual(self.counts(), {
+            'site': 1,
+            f'author:{self.author.pk}': 1,
+            f'group:{self.other.pk}': 1,
+        })
+        post.delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_recount(self):
+        Post.objects.create(author=self.author, text='Пост', group=self.group)
+        Post.objects.create(author=self.author, text='Пост')
+        counts = self.counts()
+        MonthlyPostCount.objects.all().delete()
+        archive.recount()
+        self.assertEqual(self.counts(), counts)
+
+    def test_period(self):
+        self.assertEqual(archive.period(2024, 12),
+                         (dt.date(2024, 12, 1), dt.date(2025, 1, 1)))
+        self.assertEqual(archive.period(2024, 2, 29),
+                         (dt.date(2024, 2, 29), dt.date(2024, 3, 1)))
+        self.assertEqual(archive.period(2024),
+                         (dt.date(2024, 1, 1), dt.date(2025, 1, 1)))
+
+
+class ArchiveViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.other = User.objects.create_user(username='Other')
+        cls.group = Group.objects.create(title='Сообщество', slug='group',
+                                         description='Описание')
+        cls.march = Post.objects.create(author=cls.author, text='Март',
+                                        group=cls.group)
+        cls.april = Post.objects.create(author=cls.author, text='Апрель')
+        cls.foreign = Post.objects.create(author=cls.other, text='Чужой')
+        for post, pub_date in ((cls.march, moment(2024, 3, 31, 23, 59)),
+                               (cls.april, moment(2024, 4, 1)),
+                               (cls.foreign, moment(2024, 3, 10))):
+            Post.objects.filter(pk=post.pk).update(pub_date=pub_date)
+        archive.recount()
+
+    def setUp(self):
+        cache.clear()
+
+    def posts(self, name, **kwargs):
+        response = self.client.get(reverse(name, kwargs=kwargs))
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['page'])
+
+    def test_site_archive(self):
+        self.assertEqual(self.posts('archive', year=2024),
+                         [self.april, self.march, self.foreign])
+        self.assertEqual(self.posts('archive', year=2024, month=3),
+                         [self.march, self.foreign])
+        self.assertEqual(self.posts('archive', year=2024, month=3, day=31),
+                         [self.march])
+
+    def test_author_archive(self):
+        self.assertEqual(self.posts('author_archive', username='Author',
+                                    year=2024, month=3), [self.march])
+
+    def test_group_archive(self):
+        self.assertEqual(self.posts('group_archive', slug='group',
+                                    year=2024), [self.march])
+        self.assertEqual(self.posts('group_archive', slug='group',
+                                    year=2024, month=4), [])
+
+    def test_navigation_uses_stored_counts(self):
+        url = reverse('author_archive', kwargs={'username': 'Author'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['navigation'], [
+            (2024, 2, [(dt.date(2024, 4, 1), 1), (dt.date(2024, 3, 1), 1)]),
+        ])
+        self.assertFalse(any('COUNT(' in query['sql']
+                             for query in queries.captured_queries))
+        self.assertContains(response, f'{url}2024/3/')
+
+    def test_invalid_dates(self):
+        for kwargs in ({'year': 2024, 'month': 13},
+                       {'year': 2023, 'month': 2, 'day': 29},
+                       {'year': 0}):
+            response = self.client.get(reverse('archive', kwargs=kwargs))
+            self.assertEqual(response.status_code, 404)
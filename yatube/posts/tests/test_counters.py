@@ -0,0 +1,61 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_comment_count(self):
+        comment = Comment.objects.create(post=self.post, author=self.reader,
+                                         text='Комментарий')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_posts_count(self):
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        Post.objects.create(author=self.author, text='Ещё пост').delete()
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+
+    def test_follow_counts(self):
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_recount_command(self):
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        Post.objects.update(comment_count=0)
+        UserStats.objects.all().delete()
+        call_command('recount', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+
+    def test_profile_reads_stored_counters(self):
+        UserStats.objects.filter(user=self.author).update(posts_count=42)
+        response = Client().get(
+            reverse('profile', kwargs={'username': self.author.username})
+        )
+        self.assertContains(response, 'Записей: 42')
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+@override_settings(FEED_ITEMS=3)
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        cls.other = User.objects.create_user(username='Other')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        for number in range(5):
+            Post.objects.create(author=cls.user, group=cls.group,
+                                text=f'Пост {number}')
+        Post.objects.create(author=cls.other, text='Чужой пост')
+        cls.feeds = {
+            'group_rss': {'slug': cls.group.slug},
+            'group_atom': {'slug': cls.group.slug},
+            'author_rss': {'username': cls.user.username},
+            'author_atom': {'username': cls.user.username},
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, response):
+        root = ElementTree.fromstring(response.content)
+        items = root.findall('channel/item') or root.findall(f'{ATOM}entry')
+        return [item.findtext('title') or item.findtext(f'{ATOM}title')
+                for item in items]
+
+    def test_feeds_list_newest_posts(self):
+        for name, kwargs in self.feeds.items():
+            with self.subTest(feed=name):
+                response = self.client.get(reverse(name, kwargs=kwargs))
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(self.titles(response),
+                                 ['Пост 4', 'Пост 3', 'Пост 2'])
+
+    def test_content_types(self):
+        response = self.client.get(reverse('group_rss', kwargs={
+            'slug': self.group.slug}))
+        self.assertTrue(response['Content-Type'].startswith(
+            'application/rss+xml'))
+        response = self.client.get(reverse('author_atom', kwargs={
+            'username': self.user.username}))
+        self.assertTrue(response['Content-Type'].startswith(
+            'application/atom+xml'))
+
+    def test_unknown_group_or_author(self):
+        self.assertEqual(self.client.get(reverse(
+            'group_rss', kwargs={'slug': 'missing'})).status_code,
+            HTTPStatus.NOT_FOUND)
+        self.assertEqual(self.client.get(reverse(
+            'author_atom', kwargs={'username': 'missing'})).status_code,
+            HTTPStatus.NOT_FOUND)
+
+    def test_cached_until_group_or_author_posts(self):
+        url = reverse('group_rss', kwargs={'slug': self.group.slug})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertEqual(len(queries), 0)
+        Post.objects.create(author=self.other, group=self.group,
+                            text='Новый пост')
+        self.assertEqual(self.titles(self.client.get(url))[0], 'Новый пост')
+        url = reverse('author_atom', kwargs={'username': self.other.username})
+        self.client.get(url)
+        Post.objects.create(author=self.other, text='Ещё пост')
+        self.assertEqual(self.titles(self.client.get(url))[0], 'Ещё пост')
+
+    def test_conditional_get(self):
+        for name, kwargs in self.feeds.items():
+            with self.subTest(feed=name):
+                url = reverse(name, kwargs=kwargs)
+                response = self.client.get(url)
+                self.assertFalse(response.has_header('Last-Modified'))
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+                self.assertEqual(len(queries), 0)
+
+    def test_new_post_invalidates_etag(self):
+        url = reverse('author_rss', kwargs={'username': self.user.username})
+        etag = self.client.get(url)['ETag']
+        Post.objects.create(author=self.user, text='Свежий пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(self.titles(response)[0], 'Свежий пост')
@@ -0,0 +1,169 @@
+import random
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import follow_graph
+from posts.follow_graph import FollowGraph
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FollowGraphTests(SimpleTestCase):
+    pairs = [(1, 2), (1, 3), (2, 3), (2, 4), (3, 4), (3, 5), (4, 1)]
+
+    def test_follows_and_counts(self):
+        graph = FollowGraph(self.pairs)
+        self.assertTrue(graph.follows(1, 2))
+        self.assertFalse(graph.follows(2, 1))
+        self.assertFalse(graph.follows(99, 1))
+        self.assertEqual(graph.following_count(3), 2)
+        self.assertEqual(graph.followers_count(4), 2)
+        self.assertEqual(graph.followers_count(99), 0)
+        self.assertEqual(list(graph.followers.neighbours(3)), [1, 2])
+
+    def test_follow_and_unfollow(self):
+        graph = FollowGraph(self.pairs)
+        graph.follow(5, 1)
+        graph.follow(5, 1)
+        graph.follow(99, 1)
+        graph.unfollow(1, 2)
+        graph.unfollow(1, 2)
+        self.assertTrue(graph.follows(5, 1))
+        self.assertTrue(graph.follows(99, 1))
+        self.assertFalse(graph.follows(1, 2))
+        self.assertEqual(graph.followers_count(1), 3)
+        self.assertEqual(graph.followers_count(2), 0)
+        self.assertEqual(graph.edges, len(self.pairs) + 1)
+        graph.follow(1, 2)
+        self.assertTrue(graph.follows(1, 2))
+
+    def test_compaction_keeps_edges(self):
+        rng = random.Random(0)
+        edges = {(rng.randint(1, 50), rng.randint(1, 50)) for _ in range(500)}
+        graph = FollowGraph(sorted(edges))
+        copies = None
+        with mock.patch.object(follow_graph, 'MIN_COMPACT', 10):
+            for _ in range(300):
+                edge = (rng.randint(1, 60), rng.randint(1, 60))
+                if edge in edges:
+                    edges.discard(edge)
+                    graph.unfollow(*edge)
+                else:
+                    edges.add(edge)
+                    graph.follow(*edge)
+                # Changes made while a compaction runs are replayed on it.
+                if copies is not None and rng.random() < 0.2:
+                    graph.finish_compaction(*(adjacency.compacted()
+                                              for adjacency in copies))
+                    copies = None
+                if copies is None:
+                    copies = graph.start_compaction()
+        self.assertLess(graph.following.changes, 300)
+        for user in range(1, 61):
+            self.assertEqual(
+                sorted(graph.following.neighbours(user)),
+                sorted(author for follower, author in edges
+                       if follower == user)
+            )
+            self.assertEqual(
+                graph.followers_count(user),
+                sum(1 for _, author in edges if author == user)
+            )
+
+    def test_suggestions(self):
+        graph = FollowGraph(self.pairs)
+        # 1 follows 2 and 3, who follow 3, 4 (twice) and 5.
+        self.assertEqual(graph.suggestions(1), [4, 5])
+        self.assertEqual(graph.suggestions(1, limit=1), [4])
+        self.assertEqual(graph.suggestions(99), [])
+
+
+class FollowGraphSyncTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = [User.objects.create_user(username=f'User{number}')
+                     for number in range(4)]
+
+    def setUp(self):
+        cache.clear()
+        follow_graph.reset()
+        # TestCase never commits; publish follows as they are made.
+        patcher = mock.patch('posts.follow_graph.transaction.on_commit',
+                             lambda callback: callback())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def follow(self, user, author):
+        return Follow.objects.create(user=self.users[user],
+                                     author=self.users[author])
+
+    def test_loaded_once_then_answers_from_memory(self):
+        self.follow(0, 1)
+        graph = follow_graph.graph()
+        self.assertTrue(graph.follows(self.users[0].id, self.users[1].id))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIs(follow_graph.graph(), graph)
+        self.assertEqual(len(queries), 0)
+
+    def test_follow_and_unfollow_update_the_graph(self):
+        graph = follow_graph.graph()
+        follow = self.follow(0, 1)
+        self.assertTrue(graph.follows(self.users[0].id, self.users[1].id))
+        follow.delete()
+        self.assertFalse(graph.follows(self.users[0].id, self.users[1].id))
+        self.assertIs(follow_graph.graph(), graph)
+
+    def test_other_process_replays_changes(self):
+        other = follow_graph.load()
+        follow = self.follow(0, 1)
+        self.follow(2, 3)
+        follow.delete()
+        self.assertTrue(follow_graph.sync(other))
+        self.assertFalse(other.follows(self.users[0].id, self.users[1].id))
+        self.assertTrue(other.follows(self.users[2].id, self.users[3].id))
+
+    def test_stale_graph_reloads(self):
+        graph = follow_graph.graph()
+        self.follow(0, 1)
+        caches['state'].delete(follow_graph.change_key(1))
+        self.assertFalse(follow_graph.sync(graph))
+        cache.clear()
+        fresh = follow_graph.graph()
+        self.assertIsNot(fresh, graph)
+        self.assertTrue(fresh.follows(self.users[0].id, self.users[1].id))
+
+    def test_changes_are_published_on_commit(self):
+        graph = follow_graph.graph()
+        with mock.patch('posts.follow_graph.transaction.on_commit') as commit:
+            self.follow(0, 1)
+        self.assertFalse(graph.follows(self.users[0].id, self.users[1].id))
+        self.assertIsNone(
+            caches['state'].get(follow_graph.change_key(1))
+        )
+        commit.call_args[0][0]()
+        self.assertTrue(graph.follows(self.users[0].id, self.users[1].id))
+
+    def test_database_answers_until_loaded(self):
+        self.follow(0, 1)
+        with mock.patch.object(follow_graph, 'start_loading'):
+            self.assertIsNone(follow_graph.graph())
+            self.assertTrue(follow_graph.follows(self.users[0].id,
+                                                 self.users[1].id))
+            self.assertEqual(follow_graph.suggestions(self.users[0].id), [])
+
+    def test_follow_index_suggests_authors(self):
+        self.follow(0, 1)
+        self.follow(1, 2)
+        self.follow(1, 3)
+        self.follow(0, 3)
+        self.client.force_login(self.users[0])
+        response = self.client.get(reverse('follow_index'))
+        self.assertEqual(response.context['suggestions'], [self.users[2]])
@@ -0,0 +1,147 @@
+import datetime as dt
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import counters
+from posts.models import Group, GroupActivity, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(title='Сообщество', slug='group',
+                                         description='Описание')
+        cls.other = Group.objects.create(title='Другое', slug='other',
+                                         description='Описание')
+
+    def setUp(self):
+        cache.clear()
+
+    def stats(self, group):
+        return GroupStats.objects.get(group=group)
+
+    def activity(self, group):
+        return counters.group_activity([group.pk])[group.pk]
+
+    def post(self, group, **kwargs):
+        return Post.objects.create(author=self.author, text='Пост',
+                                   group=group, **kwargs)
+
+    def test_new_group_has_empty_stats(self):
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 0)
+        self.assertIsNone(stats.last_post_at)
+
+    def test_post_created_and_deleted(self):
+        first = self.post(self.group)
+        second = self.post(self.group)
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.last_post_at, second.pub_date)
+        self.assertEqual(self.activity(self.group)[-1], 2)
+        second.delete()
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.last_post_at, first.pub_date)
+        self.assertEqual(self.activity(self.group)[-1], 1)
+        first.delete()
+        self.assertIsNone(self.stats(self.group).last_post_at)
+
+    def test_post_moved_between_groups(self):
+        post = self.post(self.group)
+        post.group = self.other
+        post.save()
+        self.assertEqual(self.stats(self.group).posts_count, 0)
+        self.assertEqual(self.stats(self.other).posts_count, 1)
+        self.assertEqual(self.activity(self.group)[-1], 0)
+        self.assertEqual(self.activity(self.other)[-1], 1)
+        post.group = None
+        post.save()
+        self.assertEqual(self.stats(self.other).posts_count, 0)
+
+    def test_edit_keeps_counts(self):
+        post = self.post(self.group)
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertEqual(self.stats(self.group).posts_count, 1)
+
+    def test_old_days_are_outside_the_window(self):
+        old = timezone.now() - dt.timedelta(days=30)
+        counters.bump_activity(self.group.pk, timezone.localdate(old), 1)
+        self.assertFalse(GroupActivity.objects.exists())
+
+    def test_reconcile_command(self):
+        self.post(self.group)
+        GroupStats.objects.all().delete()
+        GroupActivity.objects.create(
+            group=self.group, day=timezone.localdate() - dt.timedelta(days=8),
+            posts_count=5
+        )
+        call_command('reconcile_group_stats', stdout=StringIO())
+        self.assertEqual(self.stats(self.group).posts_count, 1)
+        self.assertEqual(self.stats(self.other).posts_count, 0)
+        self.assertEqual(self.activity(self.group)[-1], 1)
+        self.assertEqual(GroupActivity.objects.count(), 1)
+
+    def test_missing_row_is_recounted(self):
+        GroupStats.objects.filter(group=self.group).delete()
+        self.post(self.group)
+        self.assertEqual(self.stats(self.group).posts_count, 1)
+
+
+class GroupListViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.quiet = Group.objects.create(title='Тихое', slug='quiet',
+                                         description='Описание')
+        cls.busy = Group.objects.create(title='Шумное', slug='busy',
+                                        description='Описание')
+        Post.objects.create(author=cls.author, text='Пост', group=cls.busy)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lists_groups_by_last_post(self):
+        response = self.client.get(reverse('group_list'))
+        self.assertEqual(
+            [stats.group for stats in response.context['page']],
+            [self.busy, self.quiet]
+        )
+        self.assertEqual(response.context['page'][0].activity[-1], 1)
+
+    def test_invalid_page_not_found(self):
+        for page in ('2', 'last'):
+            with self.subTest(page=page):
+                response = self.client.get(reverse('group_list'),
+                                           {'page': page})
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_constant_queries(self):
+        with self.assertNumQueries(3):
+            self.client.get(reverse('group_list'))
+        cache.clear()
+        for number in range(5):
+            group = Group.objects.create(title=f'Группа {number}',
+                                         slug=f'group-{number}')
+            Post.objects.create(author=self.author, text='Пост', group=group)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('group_list'))
+
+    def test_new_post_updates_cached_directory(self):
+        self.client.get(reverse('group_list'))
+        Post.objects.create(author=self.author, text='Пост', group=self.quiet)
+        response = self.client.get(reverse('group_list'))
+        self.assertEqual(response.context['page'][0].group, self.quiet)
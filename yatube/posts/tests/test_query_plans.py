@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from posts import archive
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+from posts.paginators import CursorPaginator
+
+User = get_user_model()
+
+
+class QueryPlanTests(TestCase):
+    """Feed queries must walk an index in order: no sort, no table scan."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.post = Post.objects.create(author=cls.author, group=cls.group,
+                                       text='Пост')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def assertUsesIndex(self, queryset, index, seek=None):
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNotRegex(plan, r'SCAN (TABLE )?posts_post\b(?! USING)')
+        if seek:
+            # Keyset pages start at the cursor instead of the feed start.
+            self.assertRegex(plan, rf'{seek}[<>]')
+
+    def assertFeedUsesIndex(self, queryset, index, **kwargs):
+        paginator = CursorPaginator(queryset, 10, **kwargs)
+        seek = paginator.ordering[0]
+        cursor = (self.post.pub_date, self.post.pk)
+        self.assertUsesIndex(paginator._ordered()[:11], index)
+        for older in (True, False):
+            self.assertUsesIndex(paginator._keyset_query(cursor, older),
+                                 index, seek=seek)
+
+    def test_index_feed(self):
+        self.assertFeedUsesIndex(
+            Post.objects.select_related('author', 'group'),
+            'post_pub_date_idx'
+        )
+
+    def test_group_feed(self):
+        self.assertFeedUsesIndex(self.group.posts.select_related('author'),
+                                 'post_group_pub_date_idx')
+
+    def test_author_feed(self):
+        self.assertFeedUsesIndex(self.author.posts.select_related('group'),
+                                 'post_author_pub_date_idx')
+
+    def test_author_archive(self):
+        start, end = archive.period(2024, 3)
+        self.assertFeedUsesIndex(
+            archive.in_period(self.author.posts.select_related('group'),
+                              start, end),
+            'post_author_pub_date_idx'
+        )
+
+    def test_follow_feed(self):
+        self.assertFeedUsesIndex(
+            TimelineEntry.objects.filter(user=self.reader),
+            'timeline_user_pub_date_idx', ordering=('pub_date', 'post_id')
+        )
+
+    def test_post_comments(self):
+        self.assertFeedUsesIndex(
+            Comment.objects.filter(post=self.post).select_related('author'),
+            'comment_post_created_idx', ordering=('created', 'id')
+        )
+
+    def test_follow_lookup(self):
+        self.assertUsesIndex(
+            Follow.objects.filter(user=self.reader, author=self.author),
+            'COVERING INDEX'
+        )
+
+    def test_follow_is_unique(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.reader, author=self.author)
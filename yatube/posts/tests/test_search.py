@@ -0,0 +1,80 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import fulltext
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.post = Post.objects.create(author=cls.author,
+                                       text='Кошки любят молоко')
+
+    def search(self, query):
+        return fulltext.ranked(Post.objects.all(), query)[:10]
+
+    def test_new_post_is_found(self):
+        self.assertEqual(self.search('молоко'), [self.post])
+
+    def test_case_and_prefix(self):
+        self.assertEqual(self.search('КОШ'), [self.post])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search('кошки собаки'), [])
+
+    def test_edit_and_delete_update_index(self):
+        post = Post.objects.create(author=self.author, text='Старый текст')
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(self.search('старый'), [])
+        self.assertEqual(self.search('новый'), [post])
+        post.delete()
+        self.assertEqual(self.search('новый'), [])
+
+    def test_ranking(self):
+        better = Post.objects.create(author=self.author,
+                                     text='Молоко, молоко и ещё молоко')
+        self.assertEqual(self.search('молоко'), [better, self.post])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.search('"молоко* (-'), [self.post])
+        self.assertEqual(self.search('  '), [])
+
+    def test_rebuild_command(self):
+        Post.objects.filter(pk=self.post.pk).update(text='Собаки')
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search('кошки'), [])
+        self.assertEqual(self.search('собаки'), [self.post])
+
+    def test_view(self):
+        response = Client().get(reverse('search'), {'q': 'кошки'})
+        self.assertEqual(list(response.context['page']), [self.post])
+        self.assertEqual(response.context['paginator'].count, 1)
+
+    @override_settings(PER_PAGE=1)
+    def test_pages_keep_query(self):
+        Post.objects.create(author=self.author, text='Кошки спят')
+        response = Client().get(reverse('search'), {'q': 'кошки'})
+        self.assertContains(response, 'href="?q=%D0%BA%D0%BE%D1%88%D0%BA%D0%B8'
+                                      '&amp;page=2"')
+        response = Client().get(reverse('search'), {'q': 'кошки', 'page': 3})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_admin_search(self):
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse('admin:posts_post_changelist'),
+                              {'q': 'молоко'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.post])
@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from posts.models import (Comment, Follow, Group, Post, TimelineEntry,
+                          User)
+
+
+class SeedCommandTests(TestCase):
+    options = {'users': 30, 'groups': 3, 'posts': 300, 'comments': 100,
+               'follows': 80, 'chunk': 70, 'seed': 7}
+
+    def seed(self, **options):
+        call_command('seed', stdout=StringIO(), **{**self.options, **options})
+
+    def snapshot(self):
+        return (
+            list(Post.objects.order_by('pk').values_list(
+                'author__username', 'group__slug', 'text', 'pub_date')),
+            sorted(Follow.objects.values_list('user__username',
+                                              'author__username')),
+        )
+
+    def test_counts(self):
+        self.seed()
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertEqual(Follow.objects.count(), 80)
+        self.assertFalse(Follow.objects.filter(user=F('author')).exists())
+
+    def test_derived_data(self):
+        self.seed()
+        post = Post.objects.order_by('-comment_count').first()
+        self.assertEqual(post.comment_count, post.comments.count())
+        author = post.author
+        self.assertEqual(author.stats.posts_count, author.posts.count())
+        follow = Follow.objects.filter(author__posts__isnull=False).first()
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=follow.user, post__author=follow.author
+        ).exists())
+
+    def test_deterministic(self):
+        self.seed()
+        first = self.snapshot()
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.seed()
+        self.assertEqual(first[1], self.snapshot()[1])
+        self.assertEqual([row[:3] for row in first[0]],
+                         [row[:3] for row in self.snapshot()[0]])
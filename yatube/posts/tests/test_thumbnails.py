@@ -0,0 +1,102 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(name='picture.png'):
+    content = io.BytesIO()
+    Image.new('RGB', (1200, 800), (200, 30, 30)).save(content, 'PNG')
+    return SimpleUploadedFile(name, content.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0,
+                   POST_IMAGE_WIDTHS=(320, 640, 960),
+                   POST_IMAGE_FORMATS=('WEBP', 'JPEG'))
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def tearDown(self):
+        # Pooled jobs write to MEDIA_ROOT; let none outlive the test.
+        thumbnails.wait()
+
+    def index(self):
+        return self.client.get(reverse('index')).content.decode()
+
+    def test_placeholder_shown_until_generated(self):
+        post = Post.objects.create(author=self.author, text='Пост',
+                                   image=image_file())
+        self.assertIsNone(thumbnails.lookup(post.image))
+        page = self.index()
+        self.assertNotIn(post.image.url, page)
+        self.assertIn('alt="Изображение готовится"', page)
+
+        self.assertEqual(thumbnails.generate(post.pk), 6)
+        page = self.index()
+        self.assertNotIn(post.image.url, page)
+        self.assertNotIn('alt="Изображение готовится"', page)
+        for image_format in ('WEBP', 'JPEG'):
+            images = thumbnails.lookup(post.image)[image_format]
+            self.assertEqual([(image.width, image.height) for image in images],
+                             [(320, 113), (640, 226), (960, 339)])
+            self.assertIn(f'{images[0].url} 320w, {images[1].url} 640w', page)
+        self.assertIn('type="image/webp"', page)
+        self.assertIn('width="960" height="339" loading="lazy"', page)
+        self.assertEqual(thumbnails.generate(post.pk), 0)
+
+    def test_variant_formats(self):
+        post = Post.objects.create(author=self.author, text='Пост',
+                                   image=image_file())
+        thumbnails.generate(post.pk)
+        images = thumbnails.lookup(post.image)
+        for image_format, extension in (('WEBP', '.webp'), ('JPEG', '.jpg')):
+            image = images[image_format][-1]
+            self.assertTrue(image.name.endswith(extension))
+            with Image.open(image.storage.open(image.name)) as decoded:
+                self.assertEqual(decoded.format, image_format)
+
+    def test_upload_schedules_generation(self):
+        with mock.patch('posts.thumbnails.transaction.on_commit',
+                        lambda callback: callback()):
+            self.client.post(reverse('new_post'),
+                             {'text': 'С картинкой', 'image': image_file()})
+        post = Post.objects.get(text='С картинкой')
+        self.assertIsNotNone(thumbnails.lookup(post.image))
+
+    def test_backfill_command(self):
+        post = Post.objects.create(author=self.author, text='Старый пост',
+                                   image=image_file())
+        Post.objects.create(author=self.author, text='Без картинки')
+        out = io.StringIO()
+        call_command('generate_thumbnails', workers=0, stdout=out)
+        self.assertIn('Generated 6 thumbnails for 1 posts', out.getvalue())
+        self.assertIsNotNone(thumbnails.lookup(post.image))
@@ -0,0 +1,89 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts import timeline
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+
+    def timeline_texts(self):
+        return list(TimelineEntry.objects.filter(user=self.reader)
+                    .order_by('-pub_date', '-post_id')
+                    .values_list('post__text', flat=True))
+
+    def test_new_post_fans_out_to_followers(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.timeline_texts(), ['Новый пост'])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        Post.objects.create(author=self.author, text='Старый пост')
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.timeline_texts(), ['Старый пост'])
+        follow.delete()
+        self.assertEqual(self.timeline_texts(), [])
+
+    @override_settings(TIMELINE_SIZE=3)
+    def test_timeline_is_capped(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        for count in range(5):
+            Post.objects.create(author=self.author, text=f'Пост {count}')
+        self.assertEqual(self.timeline_texts(),
+                         ['Пост 4', 'Пост 3', 'Пост 2'])
+
+    @override_settings(TIMELINE_SIZE=2)
+    def test_fan_out_trims_full_timelines(self):
+        readers = [self.reader] + [
+            User.objects.create_user(username=f'Reader{count}')
+            for count in range(3)
+        ]
+        Post.objects.bulk_create(Post(author=self.author, text=f'Пост {n}')
+                                 for n in range(2))
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user=reader, post=post, pub_date=post.pub_date)
+            for reader in readers for post in Post.objects.all()
+        )
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        Follow.objects.bulk_create(Follow(user=reader, author=self.author)
+                                   for reader in readers)
+        with self.assertNumQueries(4):
+            timeline.fan_out(post)
+        for reader in readers:
+            self.assertEqual(
+                TimelineEntry.objects.filter(user=reader).count(), 2
+            )
+        self.assertEqual(self.timeline_texts()[0], 'Новый пост')
+
+    @override_settings(TIMELINE_SIZE=2)
+    def test_fan_out_skips_delete_below_cap(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        TimelineEntry.objects.filter(post=post).delete()
+        with self.assertNumQueries(3):
+            timeline.fan_out(post)
+        self.assertEqual(self.timeline_texts(), ['Новый пост'])
+
+    def test_rebuild_command(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(author=self.author, text='Пост')
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.timeline_texts(), ['Пост'])
+
+    def test_rebuild_command_clears_stale_timelines(self):
+        post = Post.objects.create(author=self.author, text='Пост')
+        TimelineEntry.objects.create(user=self.reader, post=post,
+                                     pub_date=post.pub_date)
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.timeline_texts(), [])
@@ -0,0 +1,104 @@
+import datetime as dt
+import math
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class ScoreTests(TestCase):
+    def test_weight_doubles_every_half_life(self):
+        now = timezone.now()
+        later = now + dt.timedelta(seconds=settings.TRENDING_HALF_LIFE)
+        self.assertAlmostEqual(trending.weight(later) - trending.weight(now),
+                               math.log(2))
+
+    def test_combine(self):
+        self.assertAlmostEqual(trending.combine(math.log(2), math.log(3)),
+                               math.log(5))
+        self.assertAlmostEqual(trending.combine(1e6, 1e6), 1e6 + math.log(2))
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+
+    def setUp(self):
+        cache.clear()
+        self.old = Post.objects.create(author=self.author, text='Старый')
+        self.new = Post.objects.create(author=self.author, text='Новый')
+
+    def comment(self, post):
+        return Comment.objects.create(post=post, author=self.reader,
+                                      text='Комментарий')
+
+    def test_new_posts_rank_first(self):
+        self.assertEqual(trending.top_ids(), [self.new.pk, self.old.pk])
+
+    def test_post_weighs_less_than_a_comment(self):
+        self.new.refresh_from_db()
+        self.assertAlmostEqual(
+            self.new.trending_score,
+            trending.weight(self.new.pub_date) + math.log(trending.POST_WEIGHT)
+        )
+        self.comment(self.old)
+        latest = Post.objects.create(author=self.author, text='Последний')
+        self.assertEqual(trending.top_ids(),
+                         [self.old.pk, latest.pk, self.new.pk])
+
+    def test_comments_lift_a_post(self):
+        self.comment(self.old)
+        self.assertEqual(trending.top_ids(), [self.old.pk, self.new.pk])
+        # The cached ranking matches the database.
+        cache.clear()
+        self.assertEqual(trending.top_ids(), [self.old.pk, self.new.pk])
+
+    def test_ranking_is_read_from_cache(self):
+        trending.top_ids()
+        with self.assertNumQueries(0):
+            trending.top_ids()
+
+    def test_deleted_post_is_dropped(self):
+        self.new.delete()
+        self.assertEqual(trending.top_ids(), [self.old.pk])
+
+    @override_settings(TRENDING_SIZE=2)
+    def test_ranking_is_capped(self):
+        self.comment(self.old)
+        latest = Post.objects.create(author=self.author, text='Последний')
+        self.assertEqual(trending.top_ids(), [self.old.pk, latest.pk])
+
+    def test_recompute_command(self):
+        self.comment(self.old)
+        Post.objects.update(trending_score=0)
+        call_command('recompute_trending', stdout=StringIO())
+        self.assertEqual(trending.top_ids(), [self.old.pk, self.new.pk])
+        self.old.refresh_from_db()
+        self.assertGreater(self.old.trending_score, 0)
+
+    def test_view(self):
+        self.comment(self.old)
+        response = self.client.get(reverse('trending'))
+        self.assertEqual(list(response.context['page']),
+                         [self.old, self.new])
+
+    def test_view_skips_posts_deleted_since_cached(self):
+        trending.top_ids()
+        stale = cache.get(trending.TOP_KEY)
+        self.new.delete()
+        cache.set(trending.TOP_KEY, stale)
+        response = self.client.get(reverse('trending'))
+        self.assertEqual(list(response.context['page']), [self.old])
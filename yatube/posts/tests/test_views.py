@@ -1,13 +1,20 @@
+import time
+import warnings
 from http import HTTPStatus
 
 from django import forms
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 
 from posts.models import Comment, Follow, Group, Post
+from posts.templatetags.post_cards import card_key
 
 User = get_user_model()
 
@@ -173,16 +180,38 @@ class PostPagesTests(TestCase):
         )
 
     def test_index_page_cash(self):
-        post_count = Post.objects.count()
         response_1 = self.guest_client.get(reverse('index'))
-        Post.objects.create(author=PostPagesTests.user, text=self.post.text)
-        self.assertTrue(Post.objects.count, post_count + 1)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
         response_2 = self.guest_client.get(reverse('index'))
-        self.assertCountEqual(response_1.content, response_2.content)
+        self.assertEqual(response_1.content, response_2.content)
         cache.clear()
         response_3 = self.guest_client.get(reverse('index'))
         self.assertNotEqual(response_2.content, response_3.content)
 
+    def test_index_page_cache_invalidated_on_write(self):
+        self.guest_client.get(reverse('index'))
+        Post.objects.create(author=self.user, text='Свежий пост')
+        response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Свежий пост')
+        Comment.objects.create(post=self.post, author=self.user_2,
+                               text='Комментарий')
+        response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Комментариев: 1')
+
+    def test_group_and_profile_cache_invalidated_on_write(self):
+        urls = (
+            reverse('group_posts', kwargs={'slug': self.group.slug}),
+            reverse('profile', kwargs={'username': self.user.username}),
+        )
+        for url in urls:
+            self.guest_client.get(url)
+        Post.objects.create(author=self.user, group=self.group,
+                            text='Свежий пост')
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, 'Свежий пост')
+
     def test_img_on_pages_in_context(self):
         urls = {
             'index': reverse('index'),
@@ -254,6 +283,9 @@ class PaginatorViewsTest(TestCase):
                 text=f'Тестовый пост {count}',
                 author=cls.user)
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page(self):
         response = self.authorized_client.get(reverse('index'))
         self.assertEqual(len(response.context.get('page').object_list), 10)
@@ -263,3 +295,282 @@ class PaginatorViewsTest(TestCase):
             reverse('index') + '?page=2'
         )
         self.assertEqual(len(response.context.get('page').object_list), 3)
+
+    def test_next_cursor_page(self):
+        response = self.authorized_client.get(reverse('index'))
+        next_cursor = response.context['page'].next_cursor
+        response = self.authorized_client.get(
+            reverse('index') + f'?after={next_cursor}'
+        )
+        page = response.context['page']
+        self.assertEqual(len(page.object_list), 3)
+        self.assertIsNone(page.next_cursor)
+        self.assertEqual(page[0].text, 'Тестовый пост 2')
+
+    def test_previous_cursor_page(self):
+        response = self.authorized_client.get(
+            reverse('index') + '?page=2'
+        )
+        previous_cursor = response.context['page'].previous_cursor
+        response = self.authorized_client.get(
+            reverse('index') + f'?before={previous_cursor}'
+        )
+        page = response.context['page']
+        self.assertEqual(len(page.object_list), 10)
+        self.assertEqual(page[0].text, 'Тестовый пост 12')
+        self.assertIsNone(page.previous_cursor)
+
+    def test_invalid_page_not_found(self):
+        for page in ('3', '0', 'last'):
+            with self.subTest(page=page):
+                response = self.authorized_client.get(
+                    reverse('index') + f'?page={page}'
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_cursor_links_keep_other_parameters(self):
+        response = self.authorized_client.get(
+            reverse('index') + '?page=2&lang=ru'
+        )
+        previous_cursor = response.context['page'].previous_cursor
+        self.assertContains(
+            response, f'href="?lang=ru&amp;before={previous_cursor}"'
+        )
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.authorized_client.get(
+            reverse('index') + '?after=not-a-cursor'
+        )
+        page = response.context['page']
+        self.assertEqual(page[0].text, 'Тестовый пост 12')
+
+
+class ProfilePageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.url = reverse('profile', kwargs={'username': cls.user.username})
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(author=self.user, group=self.group, text=f'Пост {number}')
+            for number in range(count)
+        )
+        cache.clear()
+
+    def test_profile_renders_only_current_page(self):
+        self.create_posts(3)
+        with CaptureQueriesContext(connection) as few_posts:
+            self.client.get(self.url)
+        self.create_posts(30)
+        with CaptureQueriesContext(connection) as many_posts:
+            response = self.client.get(self.url)
+        self.assertEqual(len(many_posts), len(few_posts))
+        self.assertEqual(len(response.context['page']), 10)
+        self.assertNotIn('post_list', response.context)
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.post = Post.objects.create(author=cls.user, group=cls.group,
+                                       text='Исходный текст')
+        cls.url = reverse('group_posts', kwargs={'slug': cls.group.slug})
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_card_is_cached(self):
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(card_key(self.post)))
+
+    def test_card_version_follows_content(self):
+        self.client.get(self.url)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Новый текст')
+        self.group.title = 'Новая группа'
+        self.group.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, '#Новая группа')
+
+    def test_edit_button_is_not_cached(self):
+        response = self.authorized_client.get(self.url)
+        self.assertContains(response, 'Редактировать')
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'Редактировать')
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.post = Post.objects.create(author=cls.user, group=cls.group,
+                                       text='Пост')
+        cls.urls = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': cls.group.slug}),
+            reverse('profile', kwargs={'username': cls.user.username}),
+            reverse('post', kwargs={'username': cls.user.username,
+                                    'post_id': cls.post.id}),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_page_is_not_modified(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertFalse(response.has_header('Last-Modified'))
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.revalidate(url, response)
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+                self.assertEqual(len(queries), 0)
+                self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_is_not_trusted(self):
+        self.client.get(self.urls[0])
+        self.client.force_login(self.user)
+        response = self.client.get(
+            self.urls[0], HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_writes_change_etag(self):
+        responses = {url: self.client.get(url) for url in self.urls}
+        Comment.objects.create(post=self.post, author=self.user,
+                               text='Комментарий')
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                response = self.revalidate(url, response)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+        url = self.urls[3]
+        response = self.client.get(url)
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(self.revalidate(url, response), 'Новое название')
+
+    def test_etag_depends_on_viewer(self):
+        response = self.client.get(self.urls[0])
+        self.client.force_login(self.user)
+        response = self.revalidate(self.urls[0], response)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_renamed_slug_is_not_stranded(self):
+        self.client.get(self.urls[1])
+        self.group.slug = 'renamed'
+        self.group.save()
+        other = Group.objects.create(title='Другая', slug='group')
+        Post.objects.create(author=self.user, group=other, text='Новый')
+        response = self.client.get(self.urls[1])
+        self.assertContains(response, 'Новый')
+
+    def test_non_ascii_username(self):
+        user = User.objects.create_user(username='Автор')
+        url = reverse('profile', kwargs={'username': user.username})
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            response = self.client.get(url)
+            self.assertEqual(self.revalidate(url, response).status_code,
+                             HTTPStatus.NOT_MODIFIED)
+
+
+@override_settings(COMMENTS_PER_PAGE=5)
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        for number in range(12):
+            commenter = User.objects.create_user(username=f'Reader{number}')
+            Comment.objects.create(post=cls.post, author=commenter,
+                                   text=f'Комментарий {number}')
+        cls.url = reverse('post', kwargs={'username': cls.author.username,
+                                          'post_id': cls.post.id})
+        cls.fragment_url = reverse('post_comments', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id
+        })
+
+    def setUp(self):
+        cache.clear()
+
+    def texts(self, response):
+        return [comment.text for comment in response.context['comments']]
+
+    def test_post_shows_newest_comments(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.texts(response),
+                         [f'Комментарий {number}'
+                          for number in range(11, 6, -1)])
+        self.assertContains(response, 'js-more-comments')
+
+    def test_queries_do_not_depend_on_comment_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        before = len(queries)
+        commenter = User.objects.create_user(username='Late')
+        Comment.objects.create(post=self.post, author=commenter,
+                               text='Ещё комментарий')
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertEqual(len(queries), before)
+
+    def test_fragment_loads_remaining_comments(self):
+        page = self.client.get(self.url).context['comments']
+        texts = []
+        url = f'{self.fragment_url}?after={page.next_cursor}'
+        while url:
+            response = self.client.get(url)
+            self.assertTemplateUsed(response,
+                                    'includes/comment_list.html')
+            self.assertNotContains(response, '<html')
+            texts += self.texts(response)
+            page = response.context['comments']
+            url = (f'{self.fragment_url}?after={page.next_cursor}'
+                   if page.next_cursor else None)
+        self.assertEqual(texts, [f'Комментарий {number}'
+                                 for number in range(6, -1, -1)])
+        self.assertNotContains(response, 'js-more-comments')
+
+    def test_older_page_links_back_to_newer_comments(self):
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'Более новые комментарии')
+        page = response.context['comments']
+        response = self.client.get(f'{self.url}?after={page.next_cursor}')
+        previous_cursor = response.context['comments'].previous_cursor
+        self.assertContains(response, f'?before={previous_cursor}#comments')
+        response = self.client.get(f'{self.url}?before={previous_cursor}')
+        self.assertEqual(self.texts(response),
+                         [f'Комментарий {number}'
+                          for number in range(11, 6, -1)])
+        fragment = self.client.get(
+            f'{self.fragment_url}?after={page.next_cursor}'
+        )
+        self.assertNotContains(fragment, 'Более новые комментарии')
+
+    def test_fragment_of_unknown_post(self):
+        url = reverse('post_comments', kwargs={'username': 'Reader0',
+                                               'post_id': self.post.id})
+        self.assertEqual(self.client.get(url).status_code,
+                         HTTPStatus.NOT_FOUND)
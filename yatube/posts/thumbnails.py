@@ -0,0 +1,165 @@
+"""Thumbnails of post images, generated off the request path.
+
+``{% thumbnail %}`` renders a missing thumbnail inside whichever request
+shows the post first, so a burst of uploads stalls the feeds on Pillow
+decodes. Instead every variant of a post image (each width in
+``settings.POST_IMAGE_WIDTHS`` in each of ``settings.POST_IMAGE_FORMATS``)
+is generated once a post with a new image is committed, on a small thread
+pool, and the source image is decoded only once for all of them. The
+files live in the media storage next to the uploads, recorded in sorl's
+key-value store. Templates only look variants up (``lookup`` never
+renders) and show an empty box of the same size while any is pending.
+
+``THUMBNAIL_WORKERS = 0`` generates synchronously, in the calling thread.
+"""
+import logging
+import threading
+from concurrent import futures
+
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from . import generations
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class Backend(ThumbnailBackend):
+    """sorl backend that can look up and batch thumbnails of one image."""
+
+    def thumbnail_file(self, source, geometry, options):
+        # The same defaults ``get_thumbnail`` applies, so the file names
+        # match the ones ``{% thumbnail %}`` would use.
+        options = dict(options)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry, options)
+        return ImageFile(name, default.storage), options
+
+    def lookup(self, file_, geometry, **options):
+        thumbnail, _ = self.thumbnail_file(ImageFile(file_), geometry,
+                                           options)
+        return default.kvstore.get(thumbnail)
+
+    def generate(self, file_, sizes):
+        """Render every missing ``(geometry, options)`` of ``sizes``."""
+        source = ImageFile(file_)
+        missing = []
+        for geometry, options in sizes:
+            thumbnail, options = self.thumbnail_file(source, geometry,
+                                                     options)
+            if not default.kvstore.get(thumbnail):
+                missing.append((geometry, options, thumbnail))
+        if not missing:
+            return 0
+        source_image = default.engine.get_image(source)
+        try:
+            source.set_size(default.engine.get_image_size(source_image))
+            image_info = default.engine.get_image_info(source_image)
+            default.kvstore.get_or_set(source)
+            for geometry, options, thumbnail in missing:
+                options['image_info'] = image_info
+                self._create_thumbnail(source_image, geometry, options,
+                                       thumbnail)
+                default.kvstore.set(thumbnail, source)
+        finally:
+            default.engine.cleanup(source_image)
+        return len(missing)
+
+
+backend = Backend()
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+def variants():
+    """``(format, geometry, options)`` of every post image variant."""
+    width, height = settings.POST_IMAGE_SIZE
+    return [
+        (image_format, f'{size}x{round(size * height / width)}',
+         dict(settings.POST_IMAGE_OPTIONS, format=image_format))
+        for size in settings.POST_IMAGE_WIDTHS
+        for image_format in settings.POST_IMAGE_FORMATS
+    ]
+
+
+def lookup(image):
+    """Variants of ``image`` by format, narrowest first, or ``None``.
+
+    ``None`` means at least one variant is not generated yet.
+    """
+    found = {}
+    for image_format, geometry, options in variants():
+        thumbnail = backend.lookup(image, geometry, **options)
+        if thumbnail is None:
+            return None
+        found.setdefault(image_format, []).append(thumbnail)
+    return found
+
+
+def generate(post_id):
+    post = Post.objects.select_related('group').filter(pk=post_id).first()
+    if post is None or not post.image:
+        return 0
+    created = backend.generate(
+        post.image, [(geometry, options) for _, geometry, options
+                     in variants()]
+    )
+    if created:
+        # Cached pages still show the fallback image.
+        generations.bump(*generations.post_keys(post))
+    return created
+
+
+def schedule(post):
+    """Generate the thumbnails of ``post`` once the transaction commits."""
+    if post.image:
+        transaction.on_commit(lambda: submit(post.pk))
+
+
+def submit(post_id):
+    if not settings.THUMBNAIL_WORKERS:
+        _run(post_id)
+        return
+    global _executor
+    with _lock:
+        if post_id in _pending:
+            return
+        if _executor is None:
+            _executor = futures.ThreadPoolExecutor(
+                settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnails'
+            )
+        _pending[post_id] = _executor.submit(_run, post_id, pooled=True)
+
+
+def wait():
+    """Block until every submitted post has its thumbnails."""
+    with _lock:
+        pending = list(_pending.values())
+    futures.wait(pending)
+
+
+def _run(post_id, pooled=False):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Thumbnails of post %s failed', post_id)
+    finally:
+        if pooled:
+            with _lock:
+                _pending.pop(post_id, None)
+            connections.close_all()
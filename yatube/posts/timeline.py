@@ -0,0 +1,84 @@
+"""Materialized follow timelines (fan-out on write).
+
+Every user has a ``TimelineEntry`` row per post of the authors they
+follow, capped at ``settings.TIMELINE_SIZE`` newest entries, so the follow
+feed is a single indexed range read instead of a join through ``Follow``.
+"""
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import OuterRef, Q, Subquery
+
+from .models import Follow, Post, TimelineEntry
+
+# Users trimmed per DELETE, to stay under SQLite's expression depth limit.
+TRIM_CHUNK = 200
+
+
+def _entries(user_id, posts):
+    return [TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts]
+
+
+def fan_out(post):
+    followers = list(Follow.objects.filter(author_id=post.author_id)
+                     .values_list('user_id', flat=True))
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+         for user_id in followers],
+        ignore_conflicts=True
+    )
+    _trim(Follow.objects.filter(author_id=post.author_id)
+          .annotate(edge=Subquery(_edge(OuterRef('user_id'))))
+          .values('edge'))
+
+
+def backfill(user_id, author_id):
+    posts = (Post.objects.filter(author_id=author_id)
+             .values_list('id', 'pub_date')[:settings.TIMELINE_SIZE])
+    TimelineEntry.objects.bulk_create(_entries(user_id, posts),
+                                      ignore_conflicts=True)
+    trim(user_id)
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id,
+                                 post__author_id=author_id).delete()
+
+
+def _edge(user_id):
+    """The first entry past the cap of a timeline, if it has one."""
+    return (TimelineEntry.objects.filter(user_id=user_id)
+            .order_by('-pub_date', '-post_id')
+            .values('pk')[settings.TIMELINE_SIZE:settings.TIMELINE_SIZE + 1])
+
+
+def _trim(edges):
+    """Cap the timelines that have an entry among ``edges``.
+
+    Finding the edge is a single seek per timeline on its index, so only
+    timelines that are actually over the cap are touched by the DELETE.
+    """
+    conditions = [
+        Q(user_id=user_id) & (Q(pub_date__lt=pub_date)
+                              | Q(pub_date=pub_date, post_id__lte=post_id))
+        for user_id, pub_date, post_id in TimelineEntry.objects.filter(
+            pk__in=edges
+        ).values_list('user_id', 'pub_date', 'post_id')
+    ]
+    for start in range(0, len(conditions), TRIM_CHUNK):
+        TimelineEntry.objects.filter(
+            reduce(or_, conditions[start:start + TRIM_CHUNK])
+        ).delete()
+
+
+def trim(user_id):
+    _trim(_edge(user_id))
+
+
+def rebuild(user_id):
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    posts = (Post.objects.filter(author__following__user_id=user_id)
+             .values_list('id', 'pub_date')[:settings.TIMELINE_SIZE])
+    TimelineEntry.objects.bulk_create(_entries(user_id, posts))
@@ -0,0 +1,128 @@
+"""Trending posts ranked by comment velocity with exponential time decay.
+
+Every comment is worth 1 at the time it happens and loses half its weight
+every ``settings.TRENDING_HALF_LIFE`` seconds. The post itself only seeds
+its score with ``POST_WEIGHT``, so new posts enter the ranking in order of
+age but a single comment outweighs a fresh post. Rather than decaying
+every score as time passes, ``Post.trending_score`` stores the natural log
+of the sum of ``worth * 2 ** ((t - EPOCH) / half_life)`` over the events
+(forward decay): an event only ever adds to the score of its own post, and
+comparing two stored scores at any moment gives the same order as
+comparing their decayed values. So a new comment is one read and one
+update of its post, and the ranking is the ``-trending_score`` index.
+
+The ``settings.TRENDING_SIZE`` best posts are also kept in the cache as
+two packed arrays, which the write path adjusts in place and the trending
+page reads without a query. Concurrent writers may overwrite each other's
+adjustments, so the cached ranking expires after
+``settings.TRENDING_TIMEOUT`` and is reread from the index.
+"""
+import math
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Comment, Post
+
+EPOCH = 1577836800  # 2020-01-01 UTC
+TOP_KEY = 'trending:top'
+POST_WEIGHT = 0.05
+
+
+def weight(moment):
+    """Log-weight of a comment at ``moment``."""
+    return ((moment.timestamp() - EPOCH) * math.log(2)
+            / settings.TRENDING_HALF_LIFE)
+
+
+def post_score(pub_date):
+    """Score of a post without comments."""
+    return weight(pub_date) + math.log(POST_WEIGHT)
+
+
+def combine(score, term):
+    """``log(exp(score) + exp(term))`` without overflow."""
+    high, low = max(score, term), min(score, term)
+    return high + math.log1p(math.exp(low - high))
+
+
+def _save(ranking):
+    ids = array('i', (post_id for _, post_id in ranking))
+    scores = array('d', (score for score, _ in ranking))
+    cache.set(TOP_KEY, (ids.tobytes(), scores.tobytes()),
+              settings.TRENDING_TIMEOUT)
+
+
+def _load():
+    ranking = list(Post.objects.order_by('-trending_score', 'pk')
+                   .values_list('trending_score', 'pk')
+                   [:settings.TRENDING_SIZE])
+    _save(ranking)
+    return ranking
+
+
+def ranking():
+    """``(score, post_id)`` of the trending posts, best first."""
+    packed = cache.get(TOP_KEY)
+    if packed is None:
+        return _load()
+    ids, scores = array('i'), array('d')
+    ids.frombytes(packed[0])
+    scores.frombytes(packed[1])
+    return list(zip(scores, ids))
+
+
+def top_ids():
+    return [post_id for _, post_id in ranking()]
+
+
+def _rank(post_id, score):
+    post_id = int(post_id)
+    entries = [entry for entry in ranking() if entry[1] != post_id]
+    if score is not None:
+        entries.append((score, post_id))
+        entries.sort(key=lambda entry: (-entry[0], entry[1]))
+    _save(entries[:settings.TRENDING_SIZE])
+
+
+def record_post(post):
+    score = post_score(post.pub_date)
+    Post.objects.filter(pk=post.pk).update(trending_score=score)
+    _rank(post.pk, score)
+
+
+def record_comment(comment):
+    with transaction.atomic():
+        score = (Post.objects.select_for_update().filter(pk=comment.post_id)
+                 .values_list('trending_score', flat=True).first())
+        if score is None:
+            return
+        score = combine(score, weight(comment.created))
+        Post.objects.filter(pk=comment.post_id).update(trending_score=score)
+    _rank(comment.post_id, score)
+
+
+def discard(post_id):
+    _rank(post_id, None)
+
+
+def recompute(chunk=1000):
+    """Recompute every score from the posts and comments."""
+    scores = {
+        post_id: post_score(pub_date) for post_id, pub_date in
+        Post.objects.values_list('pk', 'pub_date').iterator()
+    }
+    for post_id, created in Comment.objects.values_list(
+        'post_id', 'created'
+    ).iterator():
+        scores[post_id] = combine(scores[post_id], weight(created))
+    items = list(scores.items())
+    for start in range(0, len(items), chunk):
+        Post.objects.bulk_update(
+            [Post(pk=post_id, trending_score=score)
+             for post_id, score in items[start:start + chunk]],
+            ['trending_score']
+        )
+    cache.delete(TOP_KEY)
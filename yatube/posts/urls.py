@@ -1,18 +1,42 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
+
+
+def archive_paths(prefix, name):
+    return [
+        path(prefix, views.archive_posts, name=name),
+        path(f'{prefix}<int:year>/', views.archive_posts, name=name),
+        path(f'{prefix}<int:year>/<int:month>/', views.archive_posts,
+             name=name),
+        path(f'{prefix}<int:year>/<int:month>/<int:day>/',
+             views.archive_posts, name=name),
+    ]
+
 
 urlpatterns = [
     path('', views.index, name='index'),
+    *archive_paths('archive/', 'archive'),
     path('<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
     path('<str:username>/unfollow/', views.profile_unfollow,
          name='profile_unfollow'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('group/', views.group_list, name='group_list'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
+    *archive_paths('group/<slug:slug>/archive/', 'group_archive'),
     path('new/', views.new_post, name='new_post'),
+    path('search/', views.search, name='search'),
+    path('trending/', views.trending_posts, name='trending'),
     path('<str:username>/', views.profile, name='profile'),
+    path('<str:username>/rss/', feeds.author_rss, name='author_rss'),
+    path('<str:username>/atom/', feeds.author_atom, name='author_atom'),
+    *archive_paths('<str:username>/archive/', 'author_archive'),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
+    path('<str:username>/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
     path('<str:username>/<int:post_id>/edit/',
          views.post_edit, name='post_edit'),
     path('<str:username>/<int:post_id>/comment', views.add_comment,
@@ -3,29 +3,33 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.urls import reverse
 
+from . import (archive, counters, follow_graph, fulltext, generations,
+               thumbnails, trending)
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Follow, Group, GroupStats, Post, TimelineEntry, User
+from .paginators import CursorPaginator, get_page_or_404
 
 
-@cache_page(20, key_prefix='index_page')
+@generations.condition_by_generation(generations.site_key)
+@generations.cache_page_by_generation(generations.site_key)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, settings.PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.select_related('author', 'group')
+    paginator = CursorPaginator(post_list, settings.PER_PAGE)
+    page = paginator.get_page(request.GET)
     return render(request, 'index.html', {'page': page,
                                           'paginator': paginator
                                           })
 
 
+@generations.condition_by_generation(generations.group_page_key)
+@generations.cache_page_by_generation(generations.group_page_key)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, settings.PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    posts = group.posts.select_related('author')
+    paginator = CursorPaginator(posts, settings.PER_PAGE)
+    page = paginator.get_page(request.GET)
     context = {
         'group': group,
         'page': page,
@@ -34,52 +38,159 @@ def group_posts(request, slug):
     return render(request, 'group.html', context)
 
 
+@generations.condition_by_generation(generations.site_key,
+                                     generations.day_key)
+@generations.cache_page_by_generation(generations.site_key,
+                                      generations.day_key)
+def group_list(request):
+    stats = GroupStats.objects.select_related('group').order_by(
+        '-last_post_at', 'group__title'
+    )
+    paginator = Paginator(stats, settings.PER_PAGE)
+    page = get_page_or_404(paginator, request.GET.get('page'))
+    activity = counters.group_activity([row.group_id for row in page])
+    for row in page:
+        row.activity = activity[row.group_id]
+    context = {
+        'page': page,
+        'paginator': paginator,
+        'peak': max([max(days) for days in activity.values()] + [1]),
+    }
+    return render(request, 'groups.html', context)
+
+
+@generations.condition_by_generation(generations.archive_key)
+@generations.cache_page_by_generation(generations.archive_key)
+def archive_posts(request, username=None, slug=None, year=None, month=None,
+                  day=None):
+    if username is not None:
+        owner = get_object_or_404(User, username=username)
+        posts = owner.posts.select_related('group')
+        scope = archive.author_scope(owner.pk)
+        base = reverse('author_archive', kwargs={'username': username})
+    elif slug is not None:
+        owner = get_object_or_404(Group, slug=slug)
+        posts = owner.posts.select_related('author')
+        scope = archive.group_scope(owner.pk)
+        base = reverse('group_archive', kwargs={'slug': slug})
+    else:
+        owner = None
+        posts = Post.objects.select_related('author', 'group')
+        scope = archive.SITE
+        base = reverse('archive')
+    context = {
+        'owner': owner,
+        'base': base,
+        'navigation': archive.navigation(scope),
+        'year': year,
+        'month': month,
+        'day': day,
+    }
+    if year is not None:
+        start, end = archive.period(year, month, day)
+        paginator = CursorPaginator(archive.in_period(posts, start, end),
+                                    settings.PER_PAGE)
+        context.update({
+            'start': start,
+            'page': paginator.get_page(request.GET),
+            'paginator': paginator
+        })
+    return render(request, 'archive.html', context)
+
+
+def trending_posts(request):
+    paginator = Paginator(trending.top_ids(), settings.PER_PAGE)
+    page = get_page_or_404(paginator, request.GET.get('page'))
+    posts = Post.objects.select_related('author', 'group').in_bulk(page)
+    # Posts deleted since the ranking was cached are skipped.
+    page.object_list = [posts[post_id] for post_id in page if post_id in posts]
+    context = {
+        'page': page,
+        'paginator': paginator
+    }
+    return render(request, 'trending.html', context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = fulltext.ranked(Post.objects.select_related('author', 'group'),
+                            query)
+    paginator = Paginator(posts, settings.PER_PAGE)
+    page = get_page_or_404(paginator, request.GET.get('page'))
+    context = {
+        'query': query,
+        'page': page,
+        'paginator': paginator
+    }
+    return render(request, 'search.html', context)
+
+
 @login_required
 def new_post(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        thumbnails.schedule(post)
         return redirect('index')
     return render(request, 'new.html', {'form': form})
 
 
+@generations.condition_by_generation(generations.author_page_key)
+@generations.cache_page_by_generation(generations.author_page_key)
 def profile(request, username):
     profile_user = get_object_or_404(get_user_model(), username=username)
-    post_list = profile_user.posts.all()
-    paginator = Paginator(post_list, settings.PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = profile_user.posts.select_related('group')
+    paginator = CursorPaginator(post_list, settings.PER_PAGE)
+    page = paginator.get_page(request.GET)
     following = request.user.is_authenticated and (
-        Follow.objects.filter(user=request.user, author=profile_user).exists()
+        follow_graph.follows(request.user.id, profile_user.id)
     )
     context = {
         'profile': profile_user,
+        'stats': counters.user_stats(profile_user),
         'page': page,
         'paginator': paginator,
-        'post_list': post_list,
         'following': following
     }
     return render(request, 'profile.html', context)
 
 
+@generations.condition_by_generation(generations.post_page_key)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post.objects.select_related('author'),
+    post = get_object_or_404(Post.objects.select_related('author', 'group'),
                              id=post_id, author__username=username)
-    post_count = Post.objects.filter(author=post.author).count()
-    comments = post.comments.all()
+    post_count = counters.user_stats(post.author).posts_count
     form = CommentForm()
     context = {
         'profile': post.author,
         'post_count': post_count,
         'post': post,
-        'comments': comments,
+        'comments': comment_page(request, post),
         'form': form
     }
     return render(request, 'post.html', context)
 
 
+@generations.condition_by_generation(generations.post_page_key)
+def post_comments(request, username, post_id):
+    post = get_object_or_404(Post.objects.select_related('author'),
+                             id=post_id, author__username=username)
+    context = {
+        'post': post,
+        'comments': comment_page(request, post),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+def comment_page(request, post):
+    comments = post.comments.select_related('author')
+    paginator = CursorPaginator(comments, settings.COMMENTS_PER_PAGE,
+                                ordering=('created', 'id'))
+    return paginator.get_page(request.GET)
+
+
 @login_required
 def post_edit(request, username, post_id):
     if request.user.username != username:
@@ -90,6 +201,8 @@ def post_edit(request, username, post_id):
                     files=request.FILES or None, instance=post)
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect('post', username=username, post_id=post_id)
     return render(request, 'new.html', {'form': form, 'post': post})
 
@@ -108,16 +221,22 @@ def add_comment(request, username, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, settings.PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    entries = TimelineEntry.objects.filter(
+        user=request.user
+    ).select_related('post__author', 'post__group')
+    paginator = CursorPaginator(entries, settings.PER_PAGE,
+                                ordering=('pub_date', 'post_id'))
+    page = paginator.get_page(request.GET)
+    page.object_list = [entry.post for entry in page.object_list]
+    suggested = follow_graph.suggestions(request.user.id)
+    users = User.objects.in_bulk(suggested)
     return render(
         request,
         "follow.html",
         {
             'page': page,
             'paginator': paginator,
+            'suggestions': [users[pk] for pk in suggested if pk in users],
         }
     )
 
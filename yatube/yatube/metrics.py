@@ -0,0 +1,155 @@
+"""Per-request cost metrics: SQL, template rendering and cache usage.
+
+``ServerTimingMiddleware`` collects the numbers for every request and
+reports them in a ``Server-Timing`` header and as one JSON log line on the
+``yatube.metrics`` logger, keyed by the resolved URL name. It relies on
+nothing from ``debug_toolbar`` and works with ``DEBUG`` off:
+
+* SQL is counted with a ``connection.execute_wrapper`` on every database;
+* template time comes from the ``DjangoTemplates`` backend below;
+* cache hits and misses come from the cache backends below.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import time
+
+from django.core.cache.backends import locmem
+from django.db import connections
+from django.template.backends import django as django_backend
+
+from . import sqlite_cache
+
+logger = logging.getLogger('yatube.metrics')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.render_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.in_cache_call = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute wrapper.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def as_dict(self, view):
+        return {
+            'view': view,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'db_ms': round(self.db_time * 1000, 3),
+            'queries': self.queries,
+            'render_ms': round(self.render_time * 1000, 3),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+def current():
+    return _current.get()
+
+
+def server_timing(data):
+    return ', '.join([
+        f'db;dur={data["db_ms"]};desc="{data["queries"]} queries"',
+        f'tpl;dur={data["render_ms"]}',
+        f'cache;desc="{data["cache_hits"]} hits, '
+        f'{data["cache_misses"]} misses"',
+        f'total;dur={data["total_ms"]};desc="{data["view"]}"',
+    ])
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        match = request.resolver_match
+        data = metrics.as_dict(match.view_name if match else None)
+        response['Server-Timing'] = server_timing(data)
+        logger.info(json.dumps(data))
+        return response
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        metrics = current()
+        if metrics is None:
+            return super().render(context, request)
+        # Nested renders (e.g. post cards) are part of the outer one.
+        metrics.render_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.render_depth -= 1
+            if not metrics.render_depth:
+                metrics.render_time += time.perf_counter() - start
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return Template(
+            super().get_template(template_name).template, self
+        )
+
+
+class CacheMetricsMixin:
+    _missing = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._missing, version)
+        metrics = current()
+        if metrics is not None and not metrics.in_cache_call:
+            if value is self._missing:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is self._missing else value
+
+    def get_many(self, keys, version=None):
+        metrics = current()
+        if metrics is None or metrics.in_cache_call:
+            return super().get_many(keys, version)
+        keys = list(keys)
+        metrics.in_cache_call = True
+        try:
+            found = super().get_many(keys, version)
+        finally:
+            metrics.in_cache_call = False
+        metrics.cache_hits += len(found)
+        metrics.cache_misses += len(keys) - len(found)
+        return found
+
+
+class LocMemCache(CacheMetricsMixin, locmem.LocMemCache):
+    pass
+
+
+class SQLiteCache(CacheMetricsMixin, sqlite_cache.SQLiteCache):
+    pass
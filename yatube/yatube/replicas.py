@@ -0,0 +1,120 @@
+"""Read replicas with read-your-writes stickiness.
+
+``ReplicaRouter`` sends every write to the primary (``default``) and reads
+to a random alias of ``settings.DATABASE_REPLICAS``, but only inside a
+request that ``ReplicaMiddleware`` has cleared for it: a ``GET`` (or
+``HEAD``) of any view except those in ``settings.REPLICA_WRITE_VIEWS``,
+from a client that has not written in the last
+``settings.REPLICA_STICKY_SECONDS``. Everything else reads from the
+primary too: other requests, management commands, background threads.
+
+A request that may write leaves a cookie with the time its stickiness
+ends, so the writer keeps reading the primary until the replicas have
+caught up, while everybody else stays on the replicas. Pages cached by
+generation are rendered from the primary for as long after a change, so
+a lagging replica never gets a stale page cached under the new
+generation.
+
+SQLite replicas for local testing are plain copies of the primary file,
+refreshed with ``python manage.py sync_replicas``:
+
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+    }
+    DATABASE_REPLICAS = ['replica']
+"""
+import contextlib
+import contextvars
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.transaction import TransactionManagementError
+
+STICKY_COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if settings.DATABASE_REPLICAS and _replica_reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _replica_reads.set(
+            request.method in SAFE_METHODS and not self.is_sticky(request)
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        sticky = settings.REPLICA_STICKY_SECONDS
+        if sticky and (request.method not in SAFE_METHODS
+                       or getattr(request, 'wrote', False)):
+            response.set_cookie(STICKY_COOKIE, f'{time.time() + sticky:.3f}',
+                                max_age=sticky, httponly=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.view_name in settings.REPLICA_WRITE_VIEWS:
+            request.wrote = True
+            _replica_reads.set(False)
+
+    @staticmethod
+    def is_sticky(request):
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+
+@contextlib.contextmanager
+def primary():
+    """Read from the primary inside the block."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def copy_database(source, target):
+    """Overwrite the SQLite database ``target`` with a copy of ``source``.
+
+    Uses SQLite's online backup, so the copy is consistent even while the
+    primary takes writes.
+    """
+    source, target = connections[source], connections[target]
+    if source.in_atomic_block:
+        # The backup would wait for this very transaction forever.
+        raise TransactionManagementError(
+            'Cannot copy a database inside its own transaction.'
+        )
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
@@ -49,7 +49,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yatube.staticfiles.StaticFilesMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'yatube.metrics.ServerTimingMiddleware',
+    'yatube.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,7 +73,7 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'yatube.metrics.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -93,11 +96,23 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.sqlite_backend',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
 
+# Aliases in DATABASES that read-only requests may read from
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ['yatube.replicas.ReplicaRouter']
+
+# Views that write: their requests, and the writer's reads for the next
+# REPLICA_STICKY_SECONDS, go to the primary
+REPLICA_WRITE_VIEWS = ['new_post', 'post_edit', 'add_comment',
+                       'profile_follow', 'profile_unfollow']
+
+REPLICA_STICKY_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -136,7 +151,12 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 STATIC_URL = '/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, "static")
+STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
+# collectstatic output: content-hashed names with .gz siblings
+STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+STATICFILES_STORAGE = 'yatube.staticfiles.CompressedManifestStaticFilesStorage'
+# Cache lifetime of static files under their unhashed names
+STATIC_MAX_AGE = 60
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
@@ -153,8 +173,95 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 PER_PAGE = 10
 
+COMMENTS_PER_PAGE = 20
+
+# Days of per-group activity kept for the group directory
+GROUP_ACTIVITY_DAYS = 7
+
+# Trending posts: seconds for a comment to lose half its weight, posts
+# kept in the cached ranking and seconds before it is reread from the
+# database
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_SIZE = 500
+TRENDING_TIMEOUT = 10 * 60
+
+# Posts in a group or author RSS/Atom feed
+FEED_ITEMS = 20
+
+# Largest ?limit= accepted by the JSON API
+API_MAX_PAGE_SIZE = 100
+
+# Newest posts kept in a user's materialized follow timeline
+TIMELINE_SIZE = 1000
+
+# Feed pages are invalidated through generation counters on every write
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Rendered post cards are versioned by content, so they can live long
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Post images are cropped to POST_IMAGE_SIZE and rendered at every width in
+# every format (the last one is the <img> fallback) in the background on
+# upload (see posts.thumbnails); 0 workers renders them inside the request
+POST_IMAGE_SIZE = (960, 339)
+POST_IMAGE_WIDTHS = (320, 640, 960)
+POST_IMAGE_FORMATS = ('WEBP', 'JPEG')
+POST_IMAGE_OPTIONS = {'crop': 'center', 'upscale': True}
+THUMBNAIL_WORKERS = 2
+
+# The in-memory follow graph (posts.follow_graph) is loaded and compacted on
+# a background thread
+FOLLOW_GRAPH_BACKGROUND = True
+
+# Both caches are shared between the processes on the host (see
+# yatube.sqlite_cache) and report hits and misses to the request metrics.
+# Pages and post cards churn through 'default'; the generation counters and
+# the follow graph change log live in 'state', which never fills up, so no
+# amount of page traffic can evict them. Tests swap both for LocMemCache
+# (see yatube.testing).
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'yatube.metrics.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'TIMEOUT': PAGE_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+            'MAX_SIZE': 512 * 2 ** 20,
+        },
+    },
+    'state': {
+        'BACKEND': 'yatube.metrics.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'state.sqlite3'),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10 ** 7,
+        },
+    },
+}
+
+TEST_RUNNER = 'yatube.testing.TestRunner'
+
+# One JSON line per request from yatube.metrics.ServerTimingMiddleware
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'metrics': {
+            'format': '{asctime} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'metrics': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'metrics',
+        },
+    },
+    'loggers': {
+        'yatube.metrics': {
+            'handlers': ['metrics'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
@@ -0,0 +1,200 @@
+"""SQLite backend tuned for a web server with concurrent writers.
+
+Every connection switches to WAL, so readers never wait for the writer,
+and sets the rest of ``PRAGMAS`` (override any of them with
+``OPTIONS['PRAGMAS']``).
+
+Writes are serialized per database file: a thread takes the file's
+write lock before ``BEGIN IMMEDIATE`` (or before a write in autocommit
+mode) and keeps it until the commit or rollback. Writers thus queue on a
+lock instead of polling SQLite, and a transaction never starts as a
+reader and then fails to upgrade to a writer, which SQLite reports at
+once as "database is locked" instead of waiting. A write that still
+finds the database locked (say, by a process using another backend)
+waits up to ``busy_timeout`` and is then retried with exponential
+backoff.
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'yatube.sqlite_backend',
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        }
+    }
+"""
+import os
+import random
+import threading
+import time
+
+from django.db.backends.sqlite3 import base
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    # Negative sizes are in KiB: 64 MiB of page cache per connection.
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 2 ** 20,
+    'temp_store': 'MEMORY',
+}
+RETRIES = 5
+BACKOFF = 0.005
+MAX_BACKOFF = 0.2
+READ_ONLY = ('SELECT', 'PRAGMA', 'EXPLAIN', 'SAVEPOINT', 'RELEASE',
+             'ROLLBACK')
+
+_write_locks = {}
+_registry_lock = threading.Lock()
+
+
+class WriteLock:
+    """Serializes the writes to one database file.
+
+    Threads queue on a lock; processes on an advisory lock of a file next
+    to the database, where the platform has ``flock``. Either way a writer
+    wakes up as soon as the previous one is done, rather than at the next
+    poll of SQLite's busy handler.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+        if path is not None and fcntl is not None:
+            self.file = open(f'{path}-lock', 'a')
+
+    def acquire(self):
+        self.lock.acquire()
+        self.depth += 1
+        if self.depth == 1 and self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0 and self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.lock.release()
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def write_lock(path):
+    """The process's write lock of ``path`` (``None`` for in-memory)."""
+    # Keyed by pid too: a forked child must not share the parent's locks.
+    key = (os.getpid(), path)
+    with _registry_lock:
+        if key not in _write_locks:
+            _write_locks[key] = WriteLock(path)
+        return _write_locks[key]
+
+
+def is_locked(error):
+    # "database is locked", or "database table is locked" in shared cache.
+    return 'is locked' in str(error)
+
+
+def retrying(func, *args):
+    """Call ``func`` again with backoff while the database is locked."""
+    for attempt in range(RETRIES + 1):
+        try:
+            return func(*args)
+        except base.Database.OperationalError as error:
+            if attempt == RETRIES or not is_locked(error):
+                raise
+            delay = min(BACKOFF * 2 ** attempt, MAX_BACKOFF)
+            time.sleep(delay * random.uniform(0.5, 1))
+
+
+class CursorWrapper(base.SQLiteCursorWrapper):
+    wrapper = None
+
+    def execute(self, query, params=None):
+        if not self.wrapper.needs_write_lock(query):
+            return super().execute(query, params)
+        with self.wrapper.write_lock:
+            return retrying(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        if not self.wrapper.needs_write_lock(query):
+            return super().executemany(query, param_list)
+        param_list = list(param_list)
+        with self.wrapper.write_lock:
+            return retrying(super().executemany, query, param_list)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.holds_write_lock = False
+
+    @property
+    def write_lock(self):
+        path = self.settings_dict['NAME']
+        return write_lock(None if self.is_in_memory_db() else path)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop('PRAGMAS', {})}
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=CursorWrapper)
+        cursor.wrapper = self
+        return cursor
+
+    def needs_write_lock(self, query):
+        # Inside a transaction the lock is held since BEGIN IMMEDIATE.
+        return (not self.holds_write_lock
+                and not query.lstrip().upper().startswith(READ_ONLY))
+
+    def _start_transaction_under_autocommit(self):
+        self.held_lock = self.write_lock
+        self.held_lock.acquire()
+        self.holds_write_lock = True
+        try:
+            retrying(self.connection.execute, 'BEGIN IMMEDIATE')
+        except BaseException:
+            self._release_write_lock()
+            raise
+
+    def _release_write_lock(self):
+        if self.holds_write_lock:
+            self.holds_write_lock = False
+            self.held_lock.release()
+
+    def _commit(self):
+        try:
+            super()._commit()
+        finally:
+            if not self.in_transaction():
+                self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            self._release_write_lock()
+
+    def in_transaction(self):
+        return self.connection is not None and self.connection.in_transaction
@@ -0,0 +1,250 @@
+"""Cache backend shared by every process on the host, stored in SQLite.
+
+``LocMemCache`` gives each worker process a private, cold cache. This
+backend keeps entries in a single SQLite database in WAL mode instead, so
+all workers read and invalidate the same entries without running a cache
+server. Readers never block the writer and the database pages stay in the
+OS page cache, so a hit costs one indexed ``SELECT``.
+
+Eviction is LRU with TTL: expired entries go first, then the least
+recently used ones, whenever the table grows past ``MAX_ENTRIES`` or its
+values past ``MAX_SIZE`` bytes. The access time is refreshed at most once
+per ``ACCESS_RESOLUTION`` seconds, so hits do not turn into writes.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'yatube.sqlite_cache.SQLiteCache',
+            'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 100000, 'MAX_SIZE': 256 * 2 ** 20},
+        }
+    }
+"""
+import contextlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+"""
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._max_size = options.get('MAX_SIZE')
+        self._access_resolution = options.get('ACCESS_RESOLUTION', 10)
+        self._cull_every = options.get('CULL_EVERY', 100)
+        self._writes = 0
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        # One connection per thread, reopened in children after a fork.
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self._path, timeout=30,
+                                 isolation_level=None,
+                                 check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.executescript(SCHEMA)
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def _write(self, sql, params=()):
+        with self._transaction() as db:
+            return db.execute(sql, params).rowcount
+
+    def _store(self, key, value, timeout, replace=True):
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self.get_backend_timeout(timeout)
+        if replace:
+            sql = ('INSERT OR REPLACE INTO cache '
+                   '(key, value, size, expires, accessed) '
+                   'VALUES (?, ?, ?, ?, ?)')
+            params = (key, blob, len(blob), expires, time.time())
+        else:
+            # Insert unless a live entry exists, replacing an expired one.
+            sql = ('INSERT INTO cache (key, value, size, expires, accessed) '
+                   'VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET '
+                   'value = excluded.value, size = excluded.size, '
+                   'expires = excluded.expires, accessed = excluded.accessed '
+                   'WHERE cache.expires IS NOT NULL AND cache.expires <= ?')
+            params = (key, blob, len(blob), expires, time.time(), time.time())
+        stored = self._write(sql, params)
+        self._maybe_cull()
+        return bool(stored)
+
+    def _fetch(self, keys):
+        now = time.time()
+        placeholders = ', '.join('?' * len(keys))
+        rows = self._db.execute(
+            f'SELECT key, value, expires, accessed FROM cache '
+            f'WHERE key IN ({placeholders})', keys
+        ).fetchall()
+        found, stale, expired = {}, [], []
+        for key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                expired.append(key)
+                continue
+            found[key] = pickle.loads(value)
+            if now - accessed > self._access_resolution:
+                stale.append(key)
+        if stale:
+            self._touch_accessed(stale, now)
+        if expired:
+            self._delete(expired)
+        return found
+
+    def _touch_accessed(self, keys, now):
+        placeholders = ', '.join('?' * len(keys))
+        self._write(f'UPDATE cache SET accessed = ? '
+                    f'WHERE key IN ({placeholders})', [now, *keys])
+
+    def _delete(self, keys):
+        placeholders = ', '.join('?' * len(keys))
+        return self._write(f'DELETE FROM cache WHERE key IN ({placeholders})',
+                           keys)
+
+    def _maybe_cull(self):
+        self._writes += 1
+        if self._writes % self._cull_every == 0:
+            self.cull()
+
+    def cull(self):
+        """Drop expired entries, then LRU ones while over the caps."""
+        with self._transaction() as db:
+            db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+            count, size = db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache'
+            ).fetchone()
+            if count > self._max_entries:
+                excess = count - self._max_entries
+                evict = max(excess, count // self._cull_frequency)
+                db.execute('DELETE FROM cache WHERE key IN (SELECT key FROM '
+                           'cache ORDER BY accessed LIMIT ?)', (evict,))
+            if self._max_size is not None and size > self._max_size:
+                # Evict oldest entries until the running total fits again.
+                db.execute(
+                    'DELETE FROM cache WHERE key IN (SELECT key FROM '
+                    '(SELECT key, SUM(size) OVER (ORDER BY accessed DESC, '
+                    'key) AS total FROM cache) WHERE total > ?)',
+                    (self._max_size,)
+                )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._store(key, value, timeout, replace=False)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._fetch([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        made = {self.make_key(key, version=version): key for key in keys}
+        for key in made:
+            self.validate_key(key)
+        if not made:
+            return {}
+        found = self._fetch(list(made))
+        return {made[key]: value for key, value in found.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._store(key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires, now = self.get_backend_timeout(timeout), time.time()
+        rows = []
+        for key, value in data.items():
+            key = self.make_key(key, version=version)
+            self.validate_key(key)
+            blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            rows.append((key, blob, len(blob), expires, now))
+        with self._transaction() as db:
+            db.executemany('INSERT OR REPLACE INTO cache '
+                           '(key, value, size, expires, accessed) '
+                           'VALUES (?, ?, ?, ?, ?)', rows)
+        self._maybe_cull()
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return bool(self._write(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time())
+        ))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT value FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)', (key, time.time())
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            db.execute('UPDATE cache SET value = ?, size = ? WHERE key = ?',
+                       (blob, len(blob), key))
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._db.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)', (key, time.time())
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._delete([key])
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version=version) for key in keys]
+        for key in keys:
+            self.validate_key(key)
+        if keys:
+            self._delete(keys)
+
+    def clear(self):
+        self._write('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Connections are per thread and kept for the process lifetime.
+        pass
@@ -0,0 +1,144 @@
+"""Hashed, precompressed static files served by Django itself.
+
+``collectstatic`` with ``CompressedManifestStaticFilesStorage`` copies the
+files to ``STATIC_ROOT`` under content-hashed names (``app.3f2a9c1b4d5e.js``)
+and writes a gzipped sibling (``app.3f2a9c1b4d5e.js.gz``) for every file
+that compresses well, so nothing is compressed per request.
+
+``StaticFilesMiddleware`` goes first in ``MIDDLEWARE`` and answers requests
+under ``STATIC_URL`` before sessions, authentication and the rest of the
+stack run, with or without ``DEBUG``. Hashed names never change contents,
+so they are cached for a year as ``immutable``; other names are cached for
+``settings.STATIC_MAX_AGE`` seconds and revalidated with
+``Last-Modified``. Responses are ``FileResponse`` objects, which WSGI
+servers hand to ``wsgi.file_wrapper`` (``sendfile`` in gunicorn and uWSGI)
+instead of copying the file through Python.
+"""
+import gzip
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# Already compressed formats gain nothing from gzip.
+INCOMPRESSIBLE = {
+    '.gz', '.zip', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico',
+    '.woff', '.woff2', '.mp3', '.mp4', '.webm', '.pdf',
+}
+MIN_SIZE = 256
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Files that were never collected (tests, a fresh checkout) are linked
+    # under their plain names instead of failing the page.
+    manifest_strict = False
+
+    @cached_property
+    def hashed_names(self):
+        return set(self.hashed_files.values())
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        self.__dict__.pop('hashed_names', None)
+        if dry_run:
+            return
+        for name, hashed_name in self.hashed_files.items():
+            self.compress(name)
+            self.compress(hashed_name)
+
+    def compress(self, name):
+        if os.path.splitext(name)[1].lower() in INCOMPRESSIBLE:
+            return
+        path = self.path(name)
+        if not os.path.isfile(path):
+            return
+        with open(path, 'rb') as source:
+            data = source.read()
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(data) < MIN_SIZE or len(compressed) > len(data) * 0.95:
+            return
+        with open(f'{path}.gz', 'wb') as target:
+            target.write(compressed)
+
+
+class StaticFilesMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+
+    def __call__(self, request):
+        if (self.prefix.startswith('/') and request.method in ('GET', 'HEAD')
+                and request.path_info.startswith(self.prefix)):
+            response = serve(request,
+                             request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+
+def _locate(path):
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+        stat = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError):
+        return None
+    if not os.path.isfile(fullpath):
+        return None
+    return path, fullpath, stat
+
+
+def _encoded(request, fullpath, size):
+    """The file to send, its size and its ``Content-Encoding``."""
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        try:
+            return f'{fullpath}.gz', os.stat(f'{fullpath}.gz').st_size, 'gzip'
+        except OSError:
+            pass
+    return fullpath, size, None
+
+
+def serve(request, path):
+    """Response for the collected file ``path``, or ``None`` if there is
+    none (the request then goes on to the URLconf and its 404)."""
+    found = _locate(path)
+    if found is None:
+        return None
+    path, fullpath, stat = found
+    immutable = path in getattr(staticfiles_storage, 'hashed_names', ())
+    if not immutable and not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime,
+        stat.st_size
+    ):
+        return HttpResponseNotModified()
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    fullpath, size, encoding = _encoded(request, fullpath, stat.st_size)
+    response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Content-Length'] = size
+    response['Vary'] = 'Accept-Encoding'
+    if immutable:
+        response['Cache-Control'] = IMMUTABLE
+    else:
+        response['Cache-Control'] = (
+            f'public, max-age={settings.STATIC_MAX_AGE}'
+        )
+        response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
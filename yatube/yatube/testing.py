@@ -0,0 +1,56 @@
+"""Settings the test suites run with.
+
+``yatube.settings`` holds the production values only. ``manage.py test``
+applies ``OVERRIDES`` through ``TestRunner`` (``settings.TEST_RUNNER``)
+and pytest through the ``conftest.py`` in the repository root:
+
+* both cache aliases share one private LocMemCache, so ``cache.clear()``
+  in a test also resets the generation counters and the follow graph log;
+* thumbnails are rendered inside the request, as test media directories
+  must not outlive the test that wrote them;
+* the follow graph loads inline, as test data is never committed and a
+  background thread would not see it.
+"""
+import logging
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+_CACHE = {
+    'BACKEND': 'yatube.metrics.LocMemCache',
+    'LOCATION': 'yatube-tests',
+}
+
+OVERRIDES = {
+    'CACHES': {'default': _CACHE, 'state': _CACHE},
+    'THUMBNAIL_WORKERS': 0,
+    'FOLLOW_GRAPH_BACKGROUND': False,
+}
+
+
+class TestSettings(override_settings):
+    """``OVERRIDES``, with the request metrics kept out of the test output."""
+    metrics = logging.getLogger('yatube.metrics')
+
+    def __init__(self):
+        super().__init__(**OVERRIDES)
+
+    def enable(self):
+        super().enable()
+        self.metrics_level = self.metrics.level
+        self.metrics.setLevel(logging.WARNING)
+
+    def disable(self):
+        self.metrics.setLevel(self.metrics_level)
+        super().disable()
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.test_settings = TestSettings()
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,43 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('index'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertRegex(timing, r'tpl;dur=[\d.]+')
+        self.assertIn('total;dur=', timing)
+        self.assertIn('desc="index"', timing)
+
+    def test_metrics_log_line(self):
+        url = reverse('profile', kwargs={'username': self.user.username})
+        with self.assertLogs('yatube.metrics', level='INFO') as logs:
+            self.client.get(url)
+            self.client.get(url)
+        first, second = (json.loads(record.getMessage())
+                         for record in logs.records)
+        self.assertEqual(first['view'], 'profile')
+        self.assertGreater(first['queries'], 0)
+        self.assertGreater(first['render_ms'], 0)
+        self.assertGreater(first['cache_misses'], 0)
+        self.assertEqual(second['render_ms'], 0)
+        self.assertGreater(second['cache_hits'], 0)
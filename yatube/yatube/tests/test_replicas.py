@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, router
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post
+from yatube.replicas import copy_database
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Reads of a file copy of the test database that lags behind it.
+
+    The copy only catches up on ``replicate()``, so anything written in
+    between is the replication lag. Writes must be committed to be
+    copied, hence no ``TestCase``.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Author')
+        self.reader = User.objects.create_user(username='Reader')
+        self.post = Post.objects.create(author=self.author,
+                                        text='Старый пост')
+        self.directory = tempfile.mkdtemp()
+        connections.databases['replica'] = dict(
+            connections.databases['default'],
+            NAME=os.path.join(self.directory, 'replica.sqlite3')
+        )
+        self.replicate()
+        self.writer = self.client_for(self.author)
+
+    def tearDown(self):
+        connections['replica'].close()
+        del connections.databases['replica']
+        del connections['replica']
+        shutil.rmtree(self.directory)
+
+    def replicate(self):
+        copy_database('default', 'replica')
+
+    def client_for(self, user):
+        client = self.client_class()
+        client.force_login(user)
+        return client
+
+    def index(self, client):
+        return client.get(reverse('index')).content.decode()
+
+    def post_page(self, client):
+        url = reverse('post', kwargs={'username': self.author.username,
+                                      'post_id': self.post.id})
+        return client.get(url).content.decode()
+
+    def comment(self, client, text):
+        client.post(reverse('add_comment', kwargs={
+            'username': self.author.username, 'post_id': self.post.id
+        }), {'text': text})
+
+    def test_reads_lag_behind_writes(self):
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Новый комментарий')
+        self.assertIn('Старый пост', self.post_page(self.client))
+        self.assertNotIn('Новый комментарий', self.post_page(self.client))
+        self.replicate()
+        self.assertIn('Новый комментарий', self.post_page(self.client))
+
+    def test_recent_changes_are_cached_from_primary(self):
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertIn('Новый пост', self.index(self.client))
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_cached_pages_lag_without_window(self):
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertNotIn('Новый пост', self.index(self.client))
+
+    def test_read_only_requests_do_not_touch_primary(self):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            self.post_page(self.client)
+        self.assertEqual(len(primary), 0)
+        self.assertGreater(len(replica), 0)
+
+    def test_writer_reads_own_writes(self):
+        self.comment(self.writer, 'Новый комментарий')
+        self.assertIn('Новый комментарий', self.post_page(self.writer))
+        self.assertNotIn('Новый комментарий',
+                         self.post_page(self.client_for(self.reader)))
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_expires(self):
+        self.comment(self.writer, 'Новый комментарий')
+        self.assertNotIn('Новый комментарий', self.post_page(self.writer))
+
+    def test_write_views_use_primary(self):
+        client = self.client_for(self.reader)
+        url = reverse('profile_follow',
+                      kwargs={'username': self.author.username})
+        with CaptureQueriesContext(connections['replica']) as replica:
+            client.get(url)
+        self.assertEqual(len(replica), 0)
+        self.assertTrue(Follow.objects.filter(user=self.reader,
+                                              author=self.author).exists())
+        self.assertIn('primary_until', client.cookies)
+
+    def test_router(self):
+        self.assertEqual(router.db_for_write(Post), 'default')
+        # Outside a request everything reads the primary.
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
+
+    def test_sync_replicas_command(self):
+        Post.objects.create(author=self.author, text='Новый пост')
+        call_command('sync_replicas', stdout=StringIO())
+        self.assertTrue(Post.objects.using('replica')
+                        .filter(text='Новый пост').exists())
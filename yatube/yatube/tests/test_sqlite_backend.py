@@ -0,0 +1,108 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from unittest import mock
+
+from django.db import connections, transaction
+from django.test import SimpleTestCase
+
+from yatube.sqlite_backend import base
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    """The backend on a database file, as in production."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        connections.databases['file'] = {
+            'ENGINE': 'yatube.sqlite_backend',
+            'NAME': os.path.join(self.directory, 'db.sqlite3'),
+            'OPTIONS': {'PRAGMAS': {'cache_size': -1024}},
+        }
+        with connections['file'].cursor() as cursor:
+            cursor.execute('CREATE TABLE counter (id INTEGER PRIMARY KEY, '
+                           'value INTEGER)')
+            cursor.execute('INSERT INTO counter VALUES (1, 0)')
+
+    def tearDown(self):
+        connections['file'].close()
+        del connections.databases['file']
+        del connections['file']
+        shutil.rmtree(self.directory)
+
+    def pragma(self, name):
+        with connections['file'].cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('mmap_size'), 256 * 2 ** 20)
+        self.assertEqual(self.pragma('cache_size'), -1024)
+
+    def test_concurrent_read_then_write_transactions(self):
+        errors = []
+
+        def increment():
+            try:
+                for _ in range(50):
+                    with transaction.atomic(using='file'), \
+                            connections['file'].cursor() as cursor:
+                        cursor.execute('SELECT value FROM counter')
+                        value = cursor.fetchone()[0]
+                        cursor.execute('UPDATE counter SET value = %s',
+                                       [value + 1])
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections['file'].close()
+
+        threads = [threading.Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        with connections['file'].cursor() as cursor:
+            cursor.execute('SELECT value FROM counter')
+            self.assertEqual(cursor.fetchone()[0], 200)
+
+    def test_lock_released_after_rollback(self):
+        lock = connections['file'].write_lock
+        with self.assertRaises(ValueError):
+            with transaction.atomic(using='file'):
+                self.assertEqual(lock.depth, 1)
+                raise ValueError
+        self.assertEqual(lock.depth, 0)
+        self.assertFalse(connections['file'].holds_write_lock)
+
+
+class RetryTests(SimpleTestCase):
+    def test_retries_while_locked(self):
+        func = mock.Mock(side_effect=[
+            sqlite3.OperationalError('database is locked'),
+            sqlite3.OperationalError('database is locked'),
+            'done',
+        ])
+        with mock.patch('time.sleep') as sleep:
+            self.assertEqual(base.retrying(func, 'query'), 'done')
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_gives_up(self):
+        error = sqlite3.OperationalError('database is locked')
+        func = mock.Mock(side_effect=error)
+        with mock.patch('time.sleep'), \
+                self.assertRaises(sqlite3.OperationalError):
+            base.retrying(func)
+        self.assertEqual(func.call_count, base.RETRIES + 1)
+
+    def test_other_errors_are_not_retried(self):
+        func = mock.Mock(side_effect=sqlite3.OperationalError('no such table'))
+        with self.assertRaises(sqlite3.OperationalError):
+            base.retrying(func)
+        self.assertEqual(func.call_count, 1)
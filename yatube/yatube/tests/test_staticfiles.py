@@ -0,0 +1,93 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+CSS = 'body { background: url("logo.png"); }\n' * 50
+
+
+class StaticFilesTests(SimpleTestCase):
+    """collectstatic into a temporary ``STATIC_ROOT``, then serve it."""
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.source, 'site.css'), 'w') as css:
+            css.write(CSS)
+        with open(os.path.join(self.source, 'logo.png'), 'wb') as png:
+            png.write(b'\x89PNG' + bytes(1000))
+        self.settings_override = override_settings(
+            STATICFILES_DIRS=[self.source], STATIC_ROOT=self.root,
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'
+            ],
+        )
+        self.settings_override.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.hashed = staticfiles_storage.stored_name('site.css')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.source)
+        shutil.rmtree(self.root)
+
+    def get(self, name, **headers):
+        response = self.client.get(f'/static/{name}', **headers)
+        if response.streaming:
+            response.body = b''.join(response.streaming_content)
+            response.close()
+        return response
+
+    def test_collects_hashed_and_compressed_files(self):
+        self.assertRegex(self.hashed, r'^site\.[0-9a-f]{12}\.css$')
+        files = set(os.listdir(self.root))
+        self.assertIn(f'{self.hashed}.gz', files)
+        self.assertIn('site.css.gz', files)
+        self.assertNotIn('logo.png.gz', files)
+        # References inside CSS point at the hashed names too.
+        with open(os.path.join(self.root, self.hashed)) as css:
+            self.assertIn(staticfiles_storage.stored_name('logo.png'),
+                          css.read())
+
+    def test_hashed_file_is_immutable(self):
+        response = self.get(self.hashed)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.body))
+
+    def test_sends_gzip_when_accepted(self):
+        response = self.get(self.hashed, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.body))
+        self.assertLess(len(response.body), len(CSS))
+        self.assertIn(b'background', gzip.decompress(response.body))
+
+    def test_plain_names_are_revalidated(self):
+        response = self.get('site.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        response = self.get('site.css', HTTP_IF_MODIFIED_SINCE=response[
+            'Last-Modified'
+        ])
+        self.assertEqual(response.status_code, 304)
+
+    def test_skips_the_rest_of_the_stack(self):
+        response = self.get(self.hashed)
+        self.assertNotIn('Server-Timing', response)
+        self.assertFalse(response.cookies)
+
+    def test_missing_files(self):
+        for name in ('missing.css', '../settings.py', '%2e%2e/settings.py'):
+            self.assertEqual(self.get(name).status_code, 404)
+
+    def test_uncollected_files_keep_plain_names(self):
+        self.assertEqual(staticfiles_storage.url('missing.css'),
+                         '/static/missing.css')
@@ -13,6 +13,7 @@ urlpatterns = [
     path('about/', include('about.urls', namespace='about')),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
+    path('api/', include('posts.api.urls', namespace='api')),
     path('', include('posts.urls')),
 ]
 
@@ -21,6 +22,4 @@ if settings.DEBUG:
     urlpatterns += (path("__debug__/", include(debug_toolbar.urls)),)
     urlpatterns += static(settings.MEDIA_URL,
                           document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL,
-                          document_root=settings.STATIC_ROOT)
     
\ No newline at end of file
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Read the follow graph in the background before the first request needs it.
+from posts import follow_graph  # noqa: E402
+
+follow_graph.start_loading()